@@ -1,17 +1,50 @@
-from sqlmodel import SQLModel, create_engine, Session
-from typing import Generator
+from sqlalchemy import inspect, literal, text
+from sqlmodel import SQLModel, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import AsyncGenerator, Generator
 import os
 from dotenv import load_dotenv
 
+from app.db_engine import create_async_db_engine, create_db_engine
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./naira_sniper.db")
 
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_db_engine(DATABASE_URL)
+async_engine = create_async_db_engine(DATABASE_URL)
+
+def add_missing_columns(engine=engine, tables=None):
+    """create_all never alters existing tables; add new model columns in place"""
+    inspector = inspect(engine)
+    for table in tables or SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+            default = column.default.arg if column.default is not None and column.default.is_scalar else None
+            if default is not None:
+                value = literal(default, column.type).compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+                ddl += f" DEFAULT {value}"
+            with engine.begin() as conn:
+                conn.execute(text(ddl))
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
+    add_missing_columns()
+    # create_all skips indexes added to tables that already exist
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
 def get_session() -> Generator[Session, None, None]:
     with Session(engine) as session:
         yield session
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    # Objects stay loaded after commit; lazy refreshes can't run outside the event loop
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
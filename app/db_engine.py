@@ -0,0 +1,114 @@
+"""
+NAIRA SNIPER - DATABASE ENGINE
+One tuned SQLAlchemy engine factory for the API and the scraper databases
+"""
+import os
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import create_engine
+
+# Applied to every new SQLite connection
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',        # readers don't block the writer (API + scheduler)
+    'synchronous': 'NORMAL',      # safe with WAL, far fewer fsyncs than FULL
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64000,         # negative = KiB, so ~64MB page cache
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,         # ms to wait on a locked database
+}
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
+
+# Async driver used for each sync URL scheme
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    return ':memory:' in url or url in ('sqlite://', 'sqlite:///')
+
+
+def to_async_url(url: str) -> str:
+    """sqlite:///x.db -> sqlite+aiosqlite:///x.db (URLs that name a driver are kept)"""
+    parsed = make_url(url)
+    if '+' in parsed.drivername or parsed.drivername not in ASYNC_DRIVERS:
+        return url
+    return parsed.set(drivername=ASYNC_DRIVERS[parsed.drivername]).render_as_string(hide_password=False)
+
+
+def create_db_engine(
+    url: str,
+    echo: Optional[bool] = None,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None
+) -> Engine:
+    """Engine with WAL/pragmas for SQLite, a sized pool and SQL echo off unless SQL_ECHO=true"""
+    if echo is None:
+        echo = _env_flag("SQL_ECHO")
+    pool_size = pool_size or int(os.getenv("SQL_POOL_SIZE", "5"))
+    if max_overflow is None:
+        max_overflow = int(os.getenv("SQL_MAX_OVERFLOW", "10"))
+
+    if not url.startswith('sqlite'):
+        return create_engine(url, echo=echo, pool_size=pool_size,
+                             max_overflow=max_overflow, pool_pre_ping=True)
+
+    connect_args = {
+        # Pooled connections move between FastAPI's threadpool workers
+        'check_same_thread': False,
+        'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000,
+    }
+    if _is_memory_sqlite(url):
+        # In-memory databases live in a single connection; keep SQLAlchemy's pool
+        engine = create_engine(url, echo=echo, connect_args=connect_args)
+    else:
+        engine = create_engine(url, echo=echo, connect_args=connect_args,
+                               pool_size=pool_size, max_overflow=max_overflow)
+
+    event.listen(engine, 'connect', _set_sqlite_pragmas)
+    return engine
+
+
+def create_async_db_engine(
+    url: str,
+    echo: Optional[bool] = None,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None
+) -> AsyncEngine:
+    """Async counterpart of create_db_engine (aiosqlite, or asyncpg for postgres)"""
+    if echo is None:
+        echo = _env_flag("SQL_ECHO")
+    pool_size = pool_size or int(os.getenv("SQL_POOL_SIZE", "5"))
+    if max_overflow is None:
+        max_overflow = int(os.getenv("SQL_MAX_OVERFLOW", "10"))
+    async_url = to_async_url(url)
+
+    if not url.startswith('sqlite'):
+        return create_async_engine(async_url, echo=echo, pool_size=pool_size,
+                                   max_overflow=max_overflow, pool_pre_ping=True)
+
+    connect_args = {'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000}
+    if _is_memory_sqlite(url):
+        engine = create_async_engine(async_url, echo=echo, connect_args=connect_args)
+    else:
+        engine = create_async_engine(async_url, echo=echo, connect_args=connect_args,
+                                     pool_size=pool_size, max_overflow=max_overflow)
+
+    # Pragmas run on the driver-level connection, same as the sync engine
+    event.listen(engine.sync_engine, 'connect', _set_sqlite_pragmas)
+    return engine
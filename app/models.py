@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -22,6 +23,11 @@ class Product(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 class CompetitorPrice(SQLModel, table=True):
+    __table_args__ = (
+        # Market stats filter by product and scrape time
+        Index("ix_competitorprice_product_scraped", "product_id", "scraped_at"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     product_id: int = Field(foreign_key="product.id")
     source: str  # "Jiji", "Jumia", "Instagram"
@@ -36,6 +42,11 @@ class Customer(SQLModel, table=True):
     customer_type: CustomerType = Field(default=CustomerType.UNKNOWN)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     last_interaction: datetime = Field(default_factory=datetime.utcnow)
+    # Running, time-decayed sums of signal confidences (see brain/profiler.py)
+    price_score: float = Field(default=0.0)
+    quality_score: float = Field(default=0.0)
+    signal_count: int = Field(default=0)
+    scores_updated_at: Optional[datetime] = None
 
 class CustomerTypeSignal(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -44,6 +55,7 @@ class CustomerTypeSignal(SQLModel, table=True):
     signal_type: CustomerType
     confidence: float  # 0.0 to 1.0
     detected_at: datetime = Field(default_factory=datetime.utcnow)
+    source: Optional[str] = None  # "llm" or "local"; LLM labels train the local matcher
 
 class SalesLog(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -66,3 +78,9 @@ class PricingDecision(SQLModel, table=True):
     lowest_competitor_price: float
     conversion_probability: float
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class IngestCursor(SQLModel, table=True):
+    name: str = Field(primary_key=True)  # e.g. "product_prices"
+    last_id: int = Field(default=0)  # Highest source row id already ingested
+    seen_at: Optional[datetime] = None  # Latest source last_seen already ingested
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from app.database import get_session
-from app.models import Product, CompetitorPrice
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_async_session
+from app.models import Product
 from brain.core_logic import PricingAgent
+from brain.market_stats import MarketStats
 from pydantic import BaseModel
-from typing import Optional
+from typing import AsyncIterator, Dict, Optional
+import json
 
 router = APIRouter(prefix="/market", tags=["market"])
 
@@ -20,34 +23,104 @@ class MarketAnalysisResponse(BaseModel):
     reasoning: str
     conversion_probability: float
 
+class SourceStats(BaseModel):
+    avg: float
+    lowest: float
+    highest: float
+    count: int
+
+class MarketStatsResponse(BaseModel):
+    product_id: int
+    window_hours: Optional[float]
+    avg: float
+    lowest: float
+    highest: float
+    count: int
+    sources: Dict[str, SourceStats]
+
+def _analysis_response(product: Product, decision: Dict) -> MarketAnalysisResponse:
+    return MarketAnalysisResponse(
+        product_id=product.id,
+        product_name=product.name,
+        current_price=product.current_price,
+        floor_price=product.floor_price,
+        market_avg_price=decision["market_data"]["avg"],
+        lowest_competitor_price=decision["market_data"]["lowest"],
+        recommended_strategy=decision["strategy"],
+        recommended_price=decision["recommended_price"],
+        reasoning=decision["reasoning"],
+        conversion_probability=decision["conversion_probability"]
+    )
+
+@router.get("/stats/{product_id}", response_model=MarketStatsResponse)
+async def get_market_stats(
+    product_id: int,
+    window_hours: Optional[float] = Query(None, gt=0, description="Only prices scraped in the last N hours"),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Competitor price aggregates, overall and per source"""
+    if not await session.get(Product, product_id):
+        raise HTTPException(404, "Product not found")
+    
+    stats = await MarketStats().get_stats_async(session, product_id, window_hours)
+    return MarketStatsResponse(product_id=product_id, window_hours=window_hours, **stats)
+
 @router.get("/analysis/{product_id}", response_model=MarketAnalysisResponse)
-def get_market_analysis(
+async def get_market_analysis(
     product_id: int,
     customer_id: Optional[int] = None,
-    session: Session = Depends(get_session)
+    window_hours: Optional[float] = Query(None, gt=0, description="Only prices scraped in the last N hours"),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Get AI-powered market analysis and pricing recommendation"""
-    product = session.get(Product, product_id)
+    product = await session.get(Product, product_id)
     if not product:
         raise HTTPException(404, "Product not found")
     
     customer = None
     if customer_id:
         from app.models import Customer
-        customer = session.get(Customer, customer_id)
+        customer = await session.get(Customer, customer_id)
     
     agent = PricingAgent()
-    decision = agent.make_pricing_decision(session, product, customer)
+    decision = await agent.make_pricing_decision_async(session, product, customer, window_hours)
     
-    return MarketAnalysisResponse(
-        product_id=product.id,
-        product_name=product.name,
-        current_price=product.current_price,
-        floor_price=product.floor_price,
-        market_avg_price=decision["market_data"]["avg"],
-        lowest_competitor_price=decision["market_data"]["lowest"],
-        recommended_strategy=decision["strategy"],
-        recommended_price=decision["recommended_price"],
-        reasoning=decision["reasoning"],
-        conversion_probability=decision["conversion_probability"]
+    return _analysis_response(product, decision)
+
+def _sse(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.get("/analysis/{product_id}/stream")
+async def stream_market_analysis(
+    product_id: int,
+    customer_id: Optional[int] = None,
+    window_hours: Optional[float] = Query(None, gt=0, description="Only prices scraped in the last N hours"),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    Market analysis as server-sent events, so numbers show before the LLM answers:
+    market (competitor stats), baseline (rule-based recommendation),
+    token (LLM output as it is written), decision (same fields as /analysis)
+    """
+    product = await session.get(Product, product_id)
+    if not product:
+        raise HTTPException(404, "Product not found")
+    
+    customer = None
+    if customer_id:
+        from app.models import Customer
+        customer = await session.get(Customer, customer_id)
+    
+    async def events() -> AsyncIterator[str]:
+        agent = PricingAgent()
+        async for event, data in agent.stream_pricing_decision_async(session, product, customer, window_hours):
+            if event == "decision":
+                data = _analysis_response(product, data).model_dump()
+            yield _sse(event, data)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Don't let proxies buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
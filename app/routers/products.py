@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from app.database import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_async_session
 from app.models import Product
 from pydantic import BaseModel
 from typing import List
@@ -21,9 +22,9 @@ class ProductResponse(BaseModel):
     floor_price: float
 
 @router.post("/add", response_model=ProductResponse)
-def add_product(
+async def add_product(
     product_data: ProductCreate,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Add a new product to the catalog"""
     if product_data.floor_price > product_data.current_price:
@@ -36,21 +37,21 @@ def add_product(
         floor_price=product_data.floor_price
     )
     session.add(product)
-    session.commit()
-    session.refresh(product)
+    await session.commit()
+    await session.refresh(product)
     
     return product
 
 @router.get("/list", response_model=List[ProductResponse])
-def list_products(session: Session = Depends(get_session)):
+async def list_products(session: AsyncSession = Depends(get_async_session)):
     """List all products"""
-    products = session.exec(select(Product)).all()
+    products = (await session.exec(select(Product))).all()
     return products
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, session: Session = Depends(get_session)):
+async def get_product(product_id: int, session: AsyncSession = Depends(get_async_session)):
     """Get a specific product"""
-    product = session.get(Product, product_id)
+    product = await session.get(Product, product_id)
     if not product:
         raise HTTPException(404, "Product not found")
     return product
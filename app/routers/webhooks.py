@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlmodel import Session, select
-from app.database import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_async_session
 from app.models import Customer, SalesLog, Product
 from brain.profiler import CustomerProfiler
 from pydantic import BaseModel
 from typing import Optional
-from datetime import datetime
 
 router = APIRouter(prefix="/webhook", tags=["webhooks"])
 
@@ -20,9 +20,9 @@ class CustomerSignalRequest(BaseModel):
     message: str
 
 @router.post("/whatsapp")
-def handle_whatsapp_message(
+async def handle_whatsapp_message(
     data: WhatsAppMessage,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Handle incoming WhatsApp messages
@@ -31,9 +31,9 @@ def handle_whatsapp_message(
     - Log interaction
     """
     # Get or create customer
-    customer = session.exec(
+    customer = (await session.exec(
         select(Customer).where(Customer.phone == data.phone)
-    ).first()
+    )).first()
     
     if not customer:
         customer = Customer(
@@ -41,21 +41,18 @@ def handle_whatsapp_message(
             name=data.customer_name
         )
         session.add(customer)
-        session.commit()
-        session.refresh(customer)
-    else:
-        customer.last_interaction = datetime.utcnow()
-        session.add(customer)
+        # Assigns customer.id; everything commits together below
+        await session.flush()
     
-    # Classify customer type from message
+    # Classify customer type from message (also updates last_interaction)
     profiler = CustomerProfiler()
-    classification = profiler.update_customer_profile(
-        session, customer.id, data.message
+    classification = await profiler.update_customer_profile_async(
+        session, customer, data.message
     )
     
     # Log sales inquiry if product mentioned
     if data.product_id:
-        product = session.get(Product, data.product_id)
+        product = await session.get(Product, data.product_id)
         if product:
             sales_log = SalesLog(
                 customer_id=customer.id,
@@ -63,7 +60,7 @@ def handle_whatsapp_message(
             )
             session.add(sales_log)
     
-    session.commit()
+    await session.commit()
     
     return {
         "customer_id": customer.id,
@@ -73,19 +70,20 @@ def handle_whatsapp_message(
     }
 
 @router.post("/customer/signal")
-def store_customer_signal(
+async def store_customer_signal(
     data: CustomerSignalRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """Store and analyze customer signals"""
-    customer = session.get(Customer, data.customer_id)
+    customer = await session.get(Customer, data.customer_id)
     if not customer:
         raise HTTPException(404, "Customer not found")
     
     profiler = CustomerProfiler()
-    classification = profiler.update_customer_profile(
-        session, data.customer_id, data.message
+    classification = await profiler.update_customer_profile_async(
+        session, customer, data.message
     )
+    await session.commit()
     
     return {
         "customer_id": data.customer_id,
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Price database throughput: default engine vs the tuned engine factory
+
+    python benchmarks/db_bench.py --seed-rows 200000 --rounds 3 --dir /path/on/real/disk
+
+Both engines start from a copy of the same pre-filled database (--seed-rows,
+large enough that the working set outgrows SQLite's default 2MB page cache)
+and run the same workload:
+- write:  sequential PriceDatabase.ingest() batches (one transaction each)
+- read:   latest-prices queries against the database (_query_latest_prices,
+          bypassing the get_latest_prices cache so the engines are compared)
+- mixed:  the scheduler's batch writer, an API-style writer committing one
+          price at a time and N reader threads, all at once
+
+Engines alternate for --rounds rounds and the median of each metric is
+reported, so one noisy run can't decide the comparison. Before timing, the
+tuned engine's pragmas are read back from several pooled connections.
+Cache-hit throughput of get_latest_prices is reported on its own line.
+"""
+import sys
+import os
+import time
+import random
+import shutil
+import tempfile
+import argparse
+import statistics
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmodel import create_engine
+
+from app.db_engine import SQLITE_PRAGMAS, create_db_engine
+from engine.database import PriceDatabase
+
+PRODUCTS = ["iPhone 13", "power bank", "laptop", "Samsung Galaxy", "airpods", "tecno spark"]
+SOURCES = ["jumia", "jiji", "konga"]
+
+
+def make_results(rng: random.Random, batch_size: int):
+    return {
+        source: [
+            {'name': f"{source} listing {rng.randrange(10**9)}", 'price': float(rng.randrange(5000, 900000)),
+             'url': f"https://example.com/{rng.randrange(10**9)}"}
+            for _ in range(batch_size // len(SOURCES))
+        ]
+        for source in SOURCES
+    }
+
+
+def run_writes(db: PriceDatabase, batches: int, batch_size: int, seed: int) -> float:
+    rng = random.Random(seed)
+    rows = 0
+    start = time.perf_counter()
+    for _ in range(batches):
+        rows += sum(db.ingest(rng.choice(PRODUCTS), make_results(rng, batch_size)).values())
+    return rows / (time.perf_counter() - start)
+
+
+def run_reads(read, queries: int, seed: int) -> float:
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for _ in range(queries):
+        read(rng.choice(PRODUCTS), limit=50)
+    return queries / (time.perf_counter() - start)
+
+
+def run_mixed(db: PriceDatabase, batches: int, batch_size: int, readers: int, seed: int):
+    stop = threading.Event()
+    reads = [0] * readers
+    api_rows = [0]
+    errors = []
+
+    def api_writer():
+        # Small single-row transactions between the scheduler's big ones
+        rng = random.Random(seed - 1)
+        while not stop.is_set():
+            try:
+                api_rows[0] += sum(db.ingest(rng.choice(PRODUCTS), make_results(rng, len(SOURCES))).values())
+            except Exception as e:
+                errors.append(e)
+
+    def reader(slot: int):
+        rng = random.Random(seed + slot)
+        while not stop.is_set():
+            try:
+                db._query_latest_prices(rng.choice(PRODUCTS), limit=50)
+                reads[slot] += 1
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads.append(threading.Thread(target=api_writer))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    rng = random.Random(seed)
+    rows = 0
+    try:
+        for _ in range(batches):
+            try:
+                rows += sum(db.ingest(rng.choice(PRODUCTS), make_results(rng, batch_size)).values())
+            except Exception as e:
+                errors.append(e)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - start
+    return (rows + api_rows[0]) / elapsed, sum(reads) / elapsed, len(errors)
+
+
+def seed_database(path: str, rows: int, batch_size: int, seed: int):
+    """Fill a database with the default engine, so both engines start from the same file"""
+    db = PriceDatabase(engine=create_engine(f"sqlite:///{path}"))
+    rng = random.Random(seed)
+    stored = 0
+    while stored < rows:
+        stored += sum(db.ingest(rng.choice(PRODUCTS), make_results(rng, batch_size * 20)).values())
+    db.engine.dispose()
+
+
+def check_pragmas(engine, connections: int = 3):
+    """Fail loudly unless every pooled connection carries the tuned pragmas"""
+    held = [engine.raw_connection() for _ in range(connections)]
+    try:
+        for conn in held:
+            for pragma in ('journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store'):
+                value = conn.cursor().execute(f"PRAGMA {pragma}").fetchone()[0]
+                expected = SQLITE_PRAGMAS[pragma]
+                # synchronous/temp_store read back as numbers
+                expected = {'NORMAL': 1, 'MEMORY': 2}.get(expected, expected)
+                if str(value).lower() != str(expected).lower():
+                    raise RuntimeError(f"PRAGMA {pragma} is {value} on a pooled connection, expected {expected}")
+    finally:
+        for conn in held:
+            conn.close()
+
+
+def bench(make_engine, args, seed_path: str) -> dict:
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        path = os.path.join(tmp, 'prices.db')
+        shutil.copy(seed_path, path)
+        db = PriceDatabase(engine=make_engine(f"sqlite:///{path}"))
+        result = {
+            'write': run_writes(db, args.batches, args.batch_size, args.seed),
+            'read': run_reads(db._query_latest_prices, args.queries, args.seed),
+        }
+        result['mixed_write'], result['mixed_read'], result['errors'] = run_mixed(
+            db, args.batches, args.batch_size, args.readers, args.seed + 1
+        )
+        db.engine.dispose()
+    return result
+
+
+def report(label: str, runs: list) -> dict:
+    result = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    print(f"  {label:<10} write {result['write']:9.0f} rows/s   read {result['read']:7.0f} q/s   "
+          f"mixed {result['mixed_write']:9.0f} rows/s + {result['mixed_read']:7.0f} q/s   "
+          f"errors {sum(run['errors'] for run in runs)}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Price database engine benchmark')
+    parser.add_argument('--batches', type=int, default=200, help='ingest() calls per phase')
+    parser.add_argument('--batch-size', type=int, default=48, help='items per ingest() call')
+    parser.add_argument('--queries', type=int, default=1000, help='read queries')
+    parser.add_argument('--readers', type=int, default=4, help='reader threads in the mixed phase')
+    parser.add_argument('--seed-rows', type=int, default=200000, help='rows in the database before timing')
+    parser.add_argument('--rounds', type=int, default=3, help='alternating runs per engine (median reported)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--dir', help='Where to create the scratch databases (use a real disk, not tmpfs)')
+    args = parser.parse_args()
+
+    engines = {
+        'default': lambda url: create_engine(url),
+        'tuned': lambda url: create_db_engine(url, echo=False),
+    }
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        seed_path = os.path.join(tmp, 'seed.db')
+        seed_database(seed_path, args.seed_rows, args.batch_size, args.seed)
+        # On a copy: the tuned engine switches a file to WAL for good
+        check_path = os.path.join(tmp, 'check.db')
+        shutil.copy(seed_path, check_path)
+        check_engine = engines['tuned'](f"sqlite:///{check_path}")
+        check_pragmas(check_engine)
+        check_engine.dispose()
+
+        print(f"\n⏱️  {args.seed_rows} stored rows, {args.batches} batches x {args.batch_size} items, "
+              f"{args.queries} reads, {args.readers} concurrent readers + 1 API writer, "
+              f"median of {args.rounds} rounds")
+        print("=" * 60)
+        runs = {label: [] for label in engines}
+        for _ in range(args.rounds):
+            for label, make_engine in engines.items():
+                runs[label].append(bench(make_engine, args, seed_path))
+        before = report('default', runs['default'])
+        after = report('tuned', runs['tuned'])
+    print("-" * 60)
+    for key in ('write', 'read', 'mixed_write', 'mixed_read'):
+        speedup = after[key] / before[key] if before[key] else float('inf')
+        print(f"   {key:<12} x{speedup:.2f}")
+    print("-" * 60)
+    bench_cache(args)
+
+
+def bench_cache(args):
+    """get_latest_prices served from its TTL cache (no database work once warm)"""
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        db = PriceDatabase(engine=create_db_engine(f"sqlite:///{os.path.join(tmp, 'prices.db')}", echo=False))
+        run_writes(db, max(args.batches // 10, 1), args.batch_size, args.seed)
+        for product in PRODUCTS:
+            db.get_latest_prices(product, limit=50)
+        rate = run_reads(db.get_latest_prices, args.queries, args.seed)
+        stats = db.cache_stats()
+        db.engine.dispose()
+    print(f"  cache hits {rate:9.0f} q/s   (hit rate {stats['hit_rate']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
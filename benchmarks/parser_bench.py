@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+HTML parser backend micro-benchmark
+
+Parses saved Jumia/Konga/Jiji pages with every available backend and runs
+the real scraper extraction code on them. Reports per-page parse time and
+memory allocated (Python heap via tracemalloc; lexbor's own C buffers
+are not counted).
+
+Pages are matched to a site by filename (e.g. jumia_iphone.html,
+konga_laptop.html, jiji_power_bank.html).
+
+    python benchmarks/parser_bench.py --pages engine/data/pages --repeat 20
+"""
+import sys
+import os
+import glob
+import time
+import argparse
+import statistics
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.html_parser import BACKENDS, resolve_backend, parse_html
+from engine.scraper import JumiaScraper, KongaScraper, JijiScraper
+
+SITES = ('jumia', 'konga', 'jiji')
+
+
+def extract(site: str, root, scrapers) -> int:
+    """Run the scraper's selection + per-product parsing, return item count"""
+    if site == 'jumia':
+        items = [scrapers['jumia']._parse_product(p) for p in root.select('article.prd')]
+    elif site == 'konga':
+        products = []
+        for selector in ['[data-testid="productCard"]', '.product-card', '._7e3920c', 'article.product', '.product-item']:
+            products = root.select(selector)
+            if products:
+                break
+        items = [scrapers['konga']._parse_product(p) for p in products]
+    else:
+        listings = []
+        for selector in ['.b-list-advert-base', '[data-testid="product-card"]', '.listing-item', 'div[class*="advert"]', 'a[href*="/item/"]']:
+            listings = root.select(selector)
+            if listings:
+                break
+        items = [scrapers['jiji']._parse_listing(l) for l in listings]
+    return len([i for i in items if i])
+
+
+def bench_page(path: str, site: str, backend: str, repeat: int, scrapers) -> dict:
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        html = f.read()
+
+    parse_times, extract_times = [], []
+    items = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        root = parse_html(html, backend)
+        parsed = time.perf_counter()
+        items = extract(site, root, scrapers)
+        parse_times.append(parsed - start)
+        extract_times.append(time.perf_counter() - parsed)
+
+    # Allocations for one full parse + extract
+    tracemalloc.start()
+    root = parse_html(html, backend)
+    extract(site, root, scrapers)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'parse_ms': statistics.median(parse_times) * 1000,
+        'extract_ms': statistics.median(extract_times) * 1000,
+        'peak_kb': peak / 1024,
+        'retained_kb': current / 1024,
+        'items': items,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML parser backend benchmark')
+    parser.add_argument('--pages', default='engine/data/pages', help='Directory of saved .html pages')
+    parser.add_argument('--repeat', type=int, default=10, help='Timed runs per page and backend')
+    parser.add_argument('--backends', default=','.join(BACKENDS), help='Comma-separated backends')
+    args = parser.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(args.pages, '**', '*.html'), recursive=True)):
+        name = os.path.basename(path).lower()
+        site = next((s for s in SITES if s in name), None)
+        if site:
+            pages.append((path, site))
+
+    if not pages:
+        print(f"❌ No jumia/konga/jiji .html pages found in {args.pages}")
+        sys.exit(1)
+
+    backends = []
+    for backend in args.backends.split(','):
+        resolved = resolve_backend(backend.strip())
+        if resolved != backend.strip():
+            print(f"⚠️  {backend} unavailable, skipping")
+            continue
+        backends.append(resolved)
+
+    scrapers = {'jumia': JumiaScraper(), 'konga': KongaScraper(), 'jiji': JijiScraper()}
+
+    print(f"{'page':<40} {'backend':<12} {'parse ms':>9} {'extract ms':>10} {'peak KB':>9} {'kept KB':>8} {'items':>6}")
+    print("-" * 100)
+    totals = {backend: [] for backend in backends}
+    for path, site in pages:
+        for backend in backends:
+            r = bench_page(path, site, backend, args.repeat, scrapers)
+            totals[backend].append(r['parse_ms'] + r['extract_ms'])
+            print(f"{os.path.basename(path)[:40]:<40} {backend:<12} {r['parse_ms']:>9.2f} {r['extract_ms']:>10.2f} "
+                  f"{r['peak_kb']:>9.0f} {r['retained_kb']:>8.0f} {r['items']:>6}")
+
+    print("-" * 100)
+    for backend, times in totals.items():
+        print(f"📊 {backend:<12} total {sum(times):8.1f} ms over {len(times)} pages")
+
+
+if __name__ == "__main__":
+    main()
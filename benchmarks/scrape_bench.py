@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+End-to-end scrape benchmark on recorded traffic
+
+Record a catalog once against the live sites:
+
+    python benchmarks/scrape_bench.py --mode record --cassette engine/data/cassettes/base
+
+then replay it as often as needed to compare engine changes on identical input:
+
+    python benchmarks/scrape_bench.py --cassette engine/data/cassettes/base
+
+Reports wall time, cumulative time in fetch/parse/filter (summed over threads)
+and items per second for the whole catalog.
+"""
+import sys
+import os
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_CATALOG = ["iPhone", "power bank", "laptop", "Samsung phone", "airpods"]
+
+
+def load_catalog(path: str):
+    if not path:
+        return DEFAULT_CATALOG
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def build_manager(name: str):
+    if name == 'production':
+        from engine.scraper_v2 import ProductionScraperManager
+        return ProductionScraperManager()
+    from engine.scraper import ScraperManager
+    return ScraperManager()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline end-to-end scrape benchmark')
+    parser.add_argument('--mode', choices=['replay', 'record'], default='replay')
+    parser.add_argument('--cassette', default='engine/data/cassettes/default', help='Recording directory')
+    parser.add_argument('--catalog', help='Text file with one product per line')
+    parser.add_argument('--manager', choices=['basic', 'production'], default='basic',
+                        help='ScraperManager (requests) or ProductionScraperManager (Selenium)')
+    parser.add_argument('--max-results', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0, help='Seed for mock-data fallbacks')
+    args = parser.parse_args()
+
+    # Must be configured before any scraper or driver pool is built
+    from engine.replay import transport
+    from engine.http_cache import http_cache
+    from engine.page_digest import page_digests
+    from engine.profiling import stage_timings
+    transport.configure(args.mode, args.cassette)
+    if args.mode == 'replay':
+        http_cache.enabled = False
+        # Identical input every run would otherwise skip parsing entirely
+        page_digests.enabled = False
+
+    random.seed(args.seed)
+    catalog = load_catalog(args.catalog)
+    manager = build_manager(args.manager)
+    stage_timings.reset()
+
+    print(f"\n⏱️  {args.mode.upper()} {args.manager} manager over {len(catalog)} products")
+    print("=" * 60)
+
+    total_items = 0
+    start = time.perf_counter()
+    for product in catalog:
+        product_start = time.perf_counter()
+        results = manager.scrape_all(product, max_results=args.max_results)
+        items = sum(len(v) for v in results.values())
+        total_items += items
+        print(f"  {product:<30} {items:>4} items  {time.perf_counter() - product_start:7.2f}s")
+    wall = time.perf_counter() - start
+
+    if hasattr(manager, 'close_all'):
+        manager.close_all()
+
+    print("-" * 60)
+    print(f"🕒 Wall time:      {wall:8.2f}s")
+    for stage in ('fetch', 'parse', 'filter'):
+        stats = stage_timings.snapshot().get(stage, {'seconds': 0.0, 'calls': 0})
+        print(f"   {stage:<14} {stats['seconds']:8.2f}s  ({stats['calls']} calls)")
+    print(f"📦 Items:          {total_items:8d}")
+    print(f"⚡ Items/second:   {total_items / wall if wall else 0:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+from brain.llama_client import LlamaClient
+from brain.prompts import BATCH_INTENT_CLASSIFIER_PROMPT, INTENT_CLASSIFIER_PROMPT
+from typing import Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+CUSTOMER_TYPES = ("price_sensitive", "quality_sensitive", "unknown")
+
+class BatchClassifier:
+    """Coalesces concurrent intent classifications into multi-message prompts.
+
+    Callers await classify(); messages queue for up to max_wait_ms (or until
+    max_batch are waiting) and go to the LLM as one numbered list. Each
+    result resolves its caller's future and is cached under the single-message
+    prompt, so later lookups of the same phrase skip the LLM entirely.
+    Messages the model skipped resolve to None and callers fall back to
+    keywords; if a batch fails outright, every caller's future gets the error.
+    """
+
+    def __init__(self, max_batch: int = 20, max_wait_ms: float = 10.0, llama: Optional[LlamaClient] = None):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._llama = llama
+        self._pending: List[tuple] = []
+        self._timer = None
+        # Strong references, so in-flight batches aren't garbage-collected
+        self._tasks = set()
+        self.batches = 0
+        self.messages = 0
+
+    @property
+    def llama(self) -> LlamaClient:
+        if self._llama is None:
+            self._llama = LlamaClient()
+        return self._llama
+
+    def _cache_key(self, message: str) -> Optional[str]:
+        if self.llama.cache is None:
+            return None
+        return self.llama.cache.key(self.llama.model, INTENT_CLASSIFIER_PROMPT.format(message=message))
+
+    async def classify(self, message: str) -> Optional[dict]:
+        key = self._cache_key(message)
+        if key is not None:
+            cached = self.llama.cache.get(key)
+            if cached is not None:
+                return cached
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((message, key, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[tuple]):
+        try:
+            # Identical phrases ("how much last") are sent once
+            unique: Dict[str, int] = {}
+            for message, _, _ in batch:
+                unique.setdefault(message, len(unique) + 1)
+
+            results = await self._classify_batch(list(unique))
+
+            self.batches += 1
+            self.messages += len(batch)
+            for message, key, future in batch:
+                result = results.get(unique[message])
+                if result is not None and key is not None:
+                    self.llama.cache.set(key, result)
+                if not future.done():
+                    future.set_result(result)
+        except BaseException as e:
+            # No caller may be left awaiting a future nobody will resolve
+            logger.error(f"Batch intent classification failed: {e!r}")
+            for _, _, future in batch:
+                if future.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+
+    async def _classify_batch(self, messages: List[str]) -> Dict[int, dict]:
+        """{message number: classification} for the items the model answered"""
+        prompt = BATCH_INTENT_CLASSIFIER_PROMPT.format(
+            messages="\n".join(f"{number}. {json.dumps(message, ensure_ascii=False)}"
+                               for number, message in enumerate(messages, 1))
+        )
+        response = await self.llama.generate_json_async(
+            prompt, use_cache=False, max_tokens=64 + 80 * len(messages)
+        )
+        items = response.get("results", []) if isinstance(response, dict) else response or []
+
+        results = {}
+        for item in items:
+            try:
+                number = int(item["id"])
+                customer_type = str(item["customer_type"]).lower()
+                confidence = min(max(float(item.get("confidence", 0.0)), 0.0), 1.0)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if customer_type not in CUSTOMER_TYPES or not 1 <= number <= len(messages):
+                continue
+            results[number] = {
+                "customer_type": customer_type,
+                "confidence": confidence,
+                "key_signals": list(item.get("key_signals") or [])
+            }
+        return results
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "messages": self.messages,
+            "messages_per_batch": self.messages / self.batches if self.batches else 0.0
+        }
+
+# Shared by every CustomerProfiler in the process
+batch_classifier = BatchClassifier(
+    max_batch=int(os.getenv("INTENT_BATCH_SIZE", "20")),
+    max_wait_ms=float(os.getenv("INTENT_BATCH_WAIT_MS", "10"))
+)
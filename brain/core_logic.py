@@ -1,12 +1,14 @@
 from brain.llama_client import LlamaClient
 from brain.prompts import SALES_EXPERT_PROMPT
 from brain.predictive import PredictiveEngine
+from brain.market_stats import MarketStats
 from app.models import (
     Product, Customer, CustomerType, Strategy, 
-    PricingDecision, CompetitorPrice
+    PricingDecision
 )
 from sqlmodel import Session, select, func
-from typing import Dict, Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import AsyncIterator, Dict, Optional, Tuple
 from datetime import datetime
 
 class PricingAgent:
@@ -15,51 +17,119 @@ class PricingAgent:
     def __init__(self):
         self.llama = LlamaClient()
         self.predictor = PredictiveEngine()
+        self.market_stats = MarketStats()
     
-    def get_market_data(self, session: Session, product_id: int) -> Dict[str, float]:
-        """Get average and lowest competitor prices"""
-        prices = session.exec(
-            select(CompetitorPrice)
-            .where(CompetitorPrice.product_id == product_id)
-        ).all()
-        
-        if not prices:
-            return {"avg": 0, "lowest": 0}
-        
-        price_values = [p.price for p in prices]
-        return {
-            "avg": sum(price_values) / len(price_values),
-            "lowest": min(price_values)
-        }
+    def get_market_data(
+        self,
+        session: Session,
+        product_id: int,
+        window_hours: Optional[float] = None
+    ) -> Dict:
+        """Get average and lowest competitor prices (plus highest, count and per-source stats)"""
+        return self.market_stats.get_stats(session, product_id, window_hours)
+    
+    async def get_market_data_async(
+        self,
+        session: AsyncSession,
+        product_id: int,
+        window_hours: Optional[float] = None
+    ) -> Dict:
+        """get_market_data on an async session"""
+        return await self.market_stats.get_stats_async(session, product_id, window_hours)
     
     def make_pricing_decision(
         self,
         session: Session,
         product: Product,
-        customer: Optional[Customer] = None
+        customer: Optional[Customer] = None,
+        window_hours: Optional[float] = None
     ) -> Dict:
         """
         Core decision-making logic
         Returns: {strategy, price, reasoning, message_angle, conversion_prob}
         """
-        market_data = self.get_market_data(session, product.id)
+        market_data = self.get_market_data(session, product.id, window_hours)
+        customer_type = customer.customer_type if customer else CustomerType.UNKNOWN
+        
+        # Get AI recommendation
+        ai_decision = self.llama.generate_json(self._build_prompt(product, market_data, customer_type))
+        
+        decision_log, decision = self._finalize_decision(product, customer, customer_type, market_data, ai_decision)
+        session.add(decision_log)
+        session.commit()
+        return decision
+    
+    async def make_pricing_decision_async(
+        self,
+        session: AsyncSession,
+        product: Product,
+        customer: Optional[Customer] = None,
+        window_hours: Optional[float] = None
+    ) -> Dict:
+        """make_pricing_decision on an async session and the async LLM client"""
+        market_data = await self.get_market_data_async(session, product.id, window_hours)
+        customer_type = customer.customer_type if customer else CustomerType.UNKNOWN
+        
+        prompt = self._build_prompt(product, market_data, customer_type)
+        ai_decision = await self.llama.generate_json_async(prompt)
         
+        decision_log, decision = self._finalize_decision(product, customer, customer_type, market_data, ai_decision)
+        session.add(decision_log)
+        await session.commit()
+        return decision
+    
+    async def stream_pricing_decision_async(
+        self,
+        session: AsyncSession,
+        product: Product,
+        customer: Optional[Customer] = None,
+        window_hours: Optional[float] = None
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        make_pricing_decision_async as a stream of (event, data):
+        market -> baseline (rule-based, before any LLM call) -> token* -> decision
+        """
+        market_data = await self.get_market_data_async(session, product.id, window_hours)
         customer_type = customer.customer_type if customer else CustomerType.UNKNOWN
-        customer_type_str = customer_type.value
+        yield "market", market_data
+        
+        _, baseline = self._finalize_decision(product, customer, customer_type, market_data, None)
+        baseline.pop("market_data")
+        yield "baseline", baseline
         
-        # Build prompt for Llama 3
-        prompt = SALES_EXPERT_PROMPT.format(
+        ai_decision = None
+        prompt = self._build_prompt(product, market_data, customer_type)
+        async for kind, value in self.llama.stream_json_async(prompt):
+            if kind == "delta":
+                yield "token", {"text": value}
+            else:
+                ai_decision = value
+        
+        decision_log, decision = self._finalize_decision(product, customer, customer_type, market_data, ai_decision)
+        session.add(decision_log)
+        await session.commit()
+        yield "decision", decision
+    
+    def _build_prompt(self, product: Product, market_data: Dict, customer_type: CustomerType) -> str:
+        """Build prompt for Llama 3"""
+        return SALES_EXPERT_PROMPT.format(
             product_name=product.name,
             current_price=product.current_price,
             floor_price=product.floor_price,
             market_avg_price=market_data["avg"] or product.current_price,
             lowest_competitor_price=market_data["lowest"] or product.current_price,
-            customer_type=customer_type_str
+            customer_type=customer_type.value
         )
-        
-        # Get AI recommendation
-        ai_decision = self.llama.generate_json(prompt)
-        
+    
+    def _finalize_decision(
+        self,
+        product: Product,
+        customer: Optional[Customer],
+        customer_type: CustomerType,
+        market_data: Dict,
+        ai_decision: Optional[Dict]
+    ):
+        """Apply fallback and floor price, score conversion; returns (PricingDecision log, result)"""
         if not ai_decision:
             # Fallback to rule-based logic
             ai_decision = self._fallback_decision(
@@ -93,10 +163,8 @@ class PricingAgent:
             lowest_competitor_price=market_data["lowest"] or 0,
             conversion_probability=conversion_prob
         )
-        session.add(decision_log)
-        session.commit()
         
-        return {
+        return decision_log, {
             "strategy": ai_decision["strategy"],
             "recommended_price": recommended_price,
             "reasoning": ai_decision["reasoning"],
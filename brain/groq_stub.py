@@ -0,0 +1,153 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from typing import Optional
+
+# Canned answers, picked by which prompt the request carries
+CLASSIFIER_RESPONSE = {"customer_type": "price_sensitive", "confidence": 0.85, "key_signals": ["how much last"]}
+PRICING_RESPONSE = {
+    "strategy": "price_drop",
+    "recommended_price": 0,
+    "reasoning": "Stub decision",
+    "message_angle": "Best price today"
+}
+
+class GroqStub:
+    """Local stand-in for Groq's OpenAI-compatible chat completions endpoint.
+
+    Point the app at it with GROQ_BASE_URL=<stub.base_url>. `delay` (seconds)
+    and `fail_rate` (share of requests answered with HTTP 503) let tests
+    exercise timeouts, retries and the circuit breaker. Streaming requests
+    get SSE chunks, `chunk_delay` seconds apart.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay: float = 0.0,
+                 fail_rate: float = 0.0, response: Optional[dict] = None, chunk_delay: float = 0.0):
+        self.delay = delay
+        self.chunk_delay = chunk_delay
+        self.fail_rate = fail_rate
+        self.response = response
+        self.requests = 0
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _answer(self, prompt: str) -> dict:
+        if self.response is not None:
+            return self.response
+        if "Customer Messages:" in prompt:
+            # Batch classifier: one result per numbered message
+            numbers = re.findall(r'^(\d+)\. ', prompt.split("Customer Messages:")[1], re.MULTILINE)
+            return {"results": [dict(CLASSIFIER_RESPONSE, id=int(number)) for number in numbers]}
+        if "intent classifier" in prompt:
+            return CLASSIFIER_RESPONSE
+        return PRICING_RESPONSE
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: dict):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client timed out first - exactly what delay is for
+                    pass
+
+            def _stream(self, request: dict, content: str):
+                """Server-sent chat.completion.chunk events, a few characters at a time"""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                try:
+                    for start in range(0, len(content), 8):
+                        chunk = {
+                            "id": f"stub-{stub.requests}",
+                            "object": "chat.completion.chunk",
+                            "created": int(time.time()),
+                            "model": request.get("model", "stub"),
+                            "choices": [{"index": 0, "delta": {"content": content[start:start + 8]},
+                                         "finish_reason": None}]
+                        }
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                        if stub.chunk_delay:
+                            time.sleep(stub.chunk_delay)
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests += 1
+                if not self.path.endswith("/chat/completions"):
+                    return self._send(404, {"error": {"message": "not found"}})
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if stub.fail_rate and random.random() < stub.fail_rate:
+                    return self._send(503, {"error": {"message": "stub outage"}})
+
+                prompt = request["messages"][-1]["content"]
+                if request.get("stream"):
+                    return self._stream(request, json.dumps(stub._answer(prompt)))
+                self._send(200, {
+                    "id": f"stub-{stub.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "stub"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": json.dumps(stub._answer(prompt))},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+                })
+
+        return Handler
+
+    def start(self) -> "GroqStub":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Groq API stub")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with 503")
+    args = parser.parse_args()
+
+    stub = GroqStub(port=args.port, delay=args.delay, fail_rate=args.fail_rate)
+    print(f"Groq stub listening on {stub.base_url} (export GROQ_BASE_URL={stub.base_url})")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,145 @@
+from typing import Dict, Iterable, List, Tuple
+from collections import deque
+import math
+import os
+
+# Pidgin/English signal phrases and their prior weight for the class
+PRICE_PHRASES = {
+    "last price": 3.0, "how much last": 3.0, "your last": 2.5, "last last": 2.5,
+    "final price": 2.5, "best price": 2.0, "reduce": 1.5, "reduce am": 2.5,
+    "abeg reduce": 3.0, "too cost": 3.0, "e cost": 1.5, "too much": 1.5,
+    "can you drop": 2.5, "drop am": 2.5, "cheaper": 2.0, "cheap": 1.5,
+    "i see am for": 3.0, "see am for": 2.5, "discount": 2.0, "wetin be the last": 3.0,
+}
+QUALITY_PHRASES = {
+    "original": 2.5, "na original": 3.0, "is it original": 3.0, "strong": 1.5,
+    "this one strong": 2.5, "which model": 2.0, "warranty": 3.0, "guarantee": 2.5,
+    "how long": 1.5, "how long e go last": 3.0, "e go last": 2.0, "fake": 2.5,
+    "no be fake": 3.0, "fake or real": 3.0, "real": 1.0, "durable": 2.5,
+    "quality": 2.0, "genuine": 2.5, "brand new": 2.0,
+}
+
+CLASSES = ("price_sensitive", "quality_sensitive", "unknown")
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton: finds every phrase in one pass over the text"""
+
+    def __init__(self, phrases: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        for phrase in phrases:
+            self._add(phrase)
+        self._build()
+
+    def _add(self, phrase: str):
+        state = 0
+        for char in phrase:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._out[state].append(phrase)
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> List[Tuple[int, str]]:
+        """(start, phrase) for every whole-word occurrence"""
+        matches = []
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for phrase in self._out[state]:
+                start = end - len(phrase) + 1
+                # "real" must not fire inside "really"
+                if (start == 0 or not text[start - 1].isalnum()) and \
+                        (end + 1 == len(text) or not text[end + 1].isalnum()):
+                    matches.append((start, phrase))
+        return matches
+
+class IntentMatcher:
+    """Local first-tier intent classifier: phrase matches feed a multinomial
+    logistic model over (price_sensitive, quality_sensitive, unknown).
+
+    Weights start from the hand-set phrase priors above, so until fit() has
+    run on labelled messages (the app fits on LLM-labelled CustomerTypeSignal
+    rows at startup, see brain/profiler.py) the confidence is a heuristic
+    score, not a probability. Once fitted, it estimates how often the LLM
+    would give the same answer.
+    """
+
+    def __init__(self, price_phrases: Dict[str, float] = PRICE_PHRASES,
+                 quality_phrases: Dict[str, float] = QUALITY_PHRASES):
+        self.phrase_class = {}
+        self.weights: Dict[str, Dict[str, float]] = {c: {} for c in CLASSES}
+        for cls, phrases in (("price_sensitive", price_phrases), ("quality_sensitive", quality_phrases)):
+            for phrase, weight in phrases.items():
+                phrase = phrase.lower()
+                self.phrase_class[phrase] = cls
+                self.weights[cls][phrase] = weight
+        # With no signal at all, "unknown" wins
+        self.bias = {"price_sensitive": -1.0, "quality_sensitive": -1.0, "unknown": 0.0}
+        self.automaton = PhraseAutomaton(self.phrase_class)
+
+    def features(self, message: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for _, phrase in self.automaton.find(" ".join(message.lower().split())):
+            counts[phrase] = counts.get(phrase, 0) + 1
+        return counts
+
+    def _probabilities(self, features: Dict[str, int]) -> Dict[str, float]:
+        logits = {
+            cls: self.bias[cls] + sum(self.weights[cls].get(phrase, 0.0) * count for phrase, count in features.items())
+            for cls in CLASSES
+        }
+        top = max(logits.values())
+        exp = {cls: math.exp(logit - top) for cls, logit in logits.items()}
+        total = sum(exp.values())
+        return {cls: value / total for cls, value in exp.items()}
+
+    def classify(self, message: str) -> dict:
+        """Same shape as the LLM classifier's response"""
+        features = self.features(message)
+        probabilities = self._probabilities(features)
+        customer_type = max(probabilities, key=probabilities.get)
+        return {
+            "customer_type": customer_type,
+            "confidence": round(probabilities[customer_type], 3),
+            "key_signals": [p for p in features if self.phrase_class[p] == customer_type]
+        }
+
+    def fit(self, messages: List[str], labels: List[str], epochs: int = 50,
+            learning_rate: float = 0.1, l2: float = 0.01):
+        """Re-fit weights and biases by gradient descent on cross-entropy"""
+        samples = [(self.features(m), label) for m, label in zip(messages, labels) if label in CLASSES]
+        for _ in range(epochs):
+            for features, label in samples:
+                probabilities = self._probabilities(features)
+                for cls in CLASSES:
+                    error = probabilities[cls] - (1.0 if cls == label else 0.0)
+                    self.bias[cls] -= learning_rate * error
+                    for phrase, count in features.items():
+                        weight = self.weights[cls].get(phrase, 0.0)
+                        self.weights[cls][phrase] = weight - learning_rate * (error * count + l2 * weight)
+
+# Compiled once per process
+intent_matcher = IntentMatcher()
+
+# Local answers at or above this confidence skip the LLM. 0.8 is a hand-picked
+# cut: with the priors it takes one strong phrase and nothing from the other
+# class; after fitting, a local answer at 0.8 agrees with the LLM about 4 times in 5.
+LOCAL_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_LOCAL_THRESHOLD", "0.8"))
@@ -1,51 +1,306 @@
-from groq import Groq
+from groq import (
+    Groq, AsyncGroq,
+    APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+)
 import os
 import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import AsyncIterator, Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from brain.llm_cache import llm_cache
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "You are a helpful assistant that responds in valid JSON format."
+
+# Transient failures worth another attempt; anything else (bad key, bad request) fails fast
+RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+
+class CircuitBreaker:
+    """Opens after `threshold` consecutive failures; after `cooldown` seconds
+    lets a single trial call through (half-open) and closes again on success"""
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.failures >= self.threshold:
+                if self.opened_at is None:
+                    logger.warning(f"LLM circuit opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+class _SharedClients:
+    """One sync and one async Groq client per process, so HTTP connections are reused"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sync = None
+        self._async = None
+        self.breaker = CircuitBreaker(
+            threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+            cooldown=_env_float("LLM_BREAKER_COOLDOWN", 30.0)
+        )
+
+    def _options(self) -> dict:
+        # Retries are ours (jittered, deadline-aware), so the SDK's own are off
+        return {"api_key": os.getenv("GROQ_API_KEY"), "max_retries": 0,
+                "timeout": _env_float("LLM_TIMEOUT", 10.0)}
+
+    @property
+    def sync(self) -> Groq:
+        with self._lock:
+            if self._sync is None:
+                self._sync = Groq(**self._options())
+            return self._sync
+
+    @property
+    def async_(self) -> AsyncGroq:
+        # AsyncGroq's pool binds to the event loop it first runs on; the app has one
+        with self._lock:
+            if self._async is None:
+                self._async = AsyncGroq(**self._options())
+            return self._async
+
+_shared = _SharedClients()
+
 class LlamaClient:
     def __init__(self):
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
         self.model = "llama-3.1-70b-versatile"
-    
-    def generate(self, prompt: str, temperature: float = 0.7) -> str:
-        """Generate response from Llama 3"""
+        self.cache = llm_cache if os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes") else None
+        self.breaker = _shared.breaker
+        self.timeout = _env_float("LLM_TIMEOUT", 10.0)
+        self.deadline = _env_float("LLM_DEADLINE", 20.0)
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "2"))
+        self.backoff = _env_float("LLM_RETRY_BACKOFF", 0.5)
+
+    @property
+    def client(self) -> Groq:
+        return _shared.sync
+
+    @property
+    def async_client(self) -> AsyncGroq:
+        return _shared.async_
+
+    def _request(self, prompt: str, temperature: float, max_tokens: int = 1024) -> dict:
+        return {
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "model": self.model,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+
+    def _attempt_timeout(self, started: float) -> Optional[float]:
+        """Per-attempt timeout within the call deadline (None once it has passed)"""
+        remaining = self.deadline - (time.monotonic() - started)
+        return min(self.timeout, remaining) if remaining > 0 else None
+
+    def _retry_delay(self, attempt: int) -> float:
+        # Full jitter, so callers that failed together don't retry together
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    def generate(self, prompt: str, temperature: float = 0.7) -> Optional[str]:
+        """Generate response from Llama 3 (None on failure or while the circuit is open)"""
+        if not self.breaker.allow():
+            return None
+        succeeded = False
+        started = time.monotonic()
+        try:
+            for attempt in range(self.max_retries + 1):
+                timeout = self._attempt_timeout(started)
+                if timeout is None:
+                    break
+                try:
+                    chat_completion = self.client.chat.completions.create(
+                        **self._request(prompt, temperature), timeout=timeout
+                    )
+                    succeeded = True
+                    return chat_completion.choices[0].message.content
+                except RETRYABLE_ERRORS as e:
+                    logger.warning(f"Groq API attempt {attempt + 1} failed: {e}")
+                    if attempt < self.max_retries:
+                        time.sleep(self._retry_delay(attempt))
+                except Exception as e:
+                    logger.error(f"Error calling Groq API: {e}")
+                    break
+            return None
+        finally:
+            # Always settle the breaker, even on KeyboardInterrupt/cancellation,
+            # or a half-open trial would keep it shut for good
+            self._settle(succeeded)
+
+    async def generate_async(self, prompt: str, temperature: float = 0.7, max_tokens: int = 1024) -> Optional[str]:
+        """generate on the shared async client; waiting never holds a thread"""
+        if not self.breaker.allow():
+            return None
+        succeeded = False
+        started = time.monotonic()
+        try:
+            for attempt in range(self.max_retries + 1):
+                timeout = self._attempt_timeout(started)
+                if timeout is None:
+                    break
+                try:
+                    chat_completion = await self.async_client.chat.completions.create(
+                        **self._request(prompt, temperature, max_tokens), timeout=timeout
+                    )
+                    succeeded = True
+                    return chat_completion.choices[0].message.content
+                except RETRYABLE_ERRORS as e:
+                    logger.warning(f"Groq API attempt {attempt + 1} failed: {e}")
+                    if attempt < self.max_retries:
+                        await asyncio.sleep(self._retry_delay(attempt))
+                except Exception as e:
+                    logger.error(f"Error calling Groq API: {e}")
+                    break
+            return None
+        finally:
+            self._settle(succeeded)
+
+    async def stream_async(self, prompt: str, temperature: float = 0.7, max_tokens: int = 1024) -> AsyncIterator[str]:
+        """Yield response text as the model writes it. Retries only happen before
+        the first token; a stream that breaks midway just ends early."""
+        if not self.breaker.allow():
+            return
+        succeeded = received = False
+        started = time.monotonic()
+        try:
+            for attempt in range(self.max_retries + 1):
+                timeout = self._attempt_timeout(started)
+                if timeout is None:
+                    break
+                try:
+                    stream = await self.async_client.chat.completions.create(
+                        **self._request(prompt, temperature, max_tokens), stream=True, timeout=timeout
+                    )
+                    async for chunk in stream:
+                        delta = chunk.choices[0].delta.content if chunk.choices else None
+                        if delta:
+                            received = True
+                            yield delta
+                    succeeded = True
+                    return
+                except RETRYABLE_ERRORS as e:
+                    logger.warning(f"Groq API stream attempt {attempt + 1} failed: {e}")
+                    if received:
+                        break
+                    if attempt < self.max_retries:
+                        await asyncio.sleep(self._retry_delay(attempt))
+                except Exception as e:
+                    logger.error(f"Error calling Groq API: {e}")
+                    break
+        except (GeneratorExit, asyncio.CancelledError):
+            # Consumer went away (e.g. client disconnected); tokens had arrived,
+            # so the API counts as healthy
+            succeeded = received
+            raise
+        finally:
+            self._settle(succeeded)
+
+    def _settle(self, succeeded: bool):
+        if succeeded:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def _cache_key(self, prompt: str, use_cache: bool) -> Optional[str]:
+        if self.cache is None or not use_cache:
+            return None
+        return self.cache.key(self.model, prompt)
+
+    def _parse_json(self, response: Optional[str], key: Optional[str]) -> Optional[dict]:
+        if not response:
+            return None
         try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful assistant that responds in valid JSON format."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                model=self.model,
-                temperature=temperature,
-                max_tokens=1024
-            )
-            return chat_completion.choices[0].message.content
-        except Exception as e:
-            print(f"Error calling Groq API: {e}")
+            # Extract JSON from response (handle markdown code blocks)
+            if "```json" in response:
+                response = response.split("```json")[1].split("```")[0].strip()
+            elif "```" in response:
+                response = response.split("```")[1].split("```")[0].strip()
+            result = json.loads(response)
+        except json.JSONDecodeError as e:
+            logger.error(f"Error parsing JSON: {e}. Response was: {response}")
             return None
-    
-    def generate_json(self, prompt: str) -> dict:
-        """Generate and parse JSON response"""
-        response = self.generate(prompt, temperature=0.3)
-        if response:
-            try:
-                # Extract JSON from response (handle markdown code blocks)
-                if "```json" in response:
-                    response = response.split("```json")[1].split("```")[0].strip()
-                elif "```" in response:
-                    response = response.split("```")[1].split("```")[0].strip()
-                return json.loads(response)
-            except json.JSONDecodeError as e:
-                print(f"Error parsing JSON: {e}")
-                print(f"Response was: {response}")
-                return None
-        return None
+        # Failures aren't cached, so the next call retries the API
+        if key is not None:
+            self.cache.set(key, result)
+        return result
+
+    def generate_json(self, prompt: str, use_cache: bool = True) -> dict:
+        """Generate and parse JSON response (served from the LLM cache when possible)"""
+        key = self._cache_key(prompt, use_cache)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        return self._parse_json(self.generate(prompt, temperature=0.3), key)
+
+    async def generate_json_async(self, prompt: str, use_cache: bool = True, max_tokens: int = 1024) -> dict:
+        """generate_json on the shared async client"""
+        key = self._cache_key(prompt, use_cache)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        return self._parse_json(await self.generate_async(prompt, temperature=0.3, max_tokens=max_tokens), key)
+
+    async def stream_json_async(
+        self, prompt: str, use_cache: bool = True, max_tokens: int = 1024
+    ) -> AsyncIterator[Tuple[str, object]]:
+        """Streaming generate_json: yields ("delta", text) while the model writes,
+        then ("result", parsed JSON or None). A cache hit yields only the result."""
+        key = self._cache_key(prompt, use_cache)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield "result", cached
+                return
+        parts = []
+        async for delta in self.stream_async(prompt, temperature=0.3, max_tokens=max_tokens):
+            parts.append(delta)
+            yield "delta", delta
+        yield "result", self._parse_json("".join(parts), key)
@@ -0,0 +1,126 @@
+from cachetools import TTLCache
+from typing import Dict, Optional
+import copy
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+
+_PRICE = re.compile(r'₦\s*(\d[\d,]*(?:\.\d+)?)')
+_PUNCTUATION = re.compile(r'[^\w\s₦~]+')
+_WHITESPACE = re.compile(r'\s+')
+
+class LLMCache:
+    """TTL + LRU cache for parsed LLM JSON responses, keyed on a normalized prompt.
+
+    Normalizing (case, punctuation, whitespace) makes "How much last??" and
+    "how much last" share an entry. Naira amounts are bucketed on a log scale
+    (price_bucket=0.02 puts prices within ~2% of each other in one bucket), so
+    pricing prompts whose market numbers barely moved reuse a decision; the
+    floor price is re-applied to every decision after the cache. Entries can
+    persist to SQLite so restarts keep a warm cache.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 3600,
+        price_bucket: float = 0.02,
+        path: Optional[str] = None
+    ):
+        self.ttl = ttl
+        self.price_bucket = price_bucket
+        self.path = path
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._disk = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _bucket_price(self, match) -> str:
+        price = float(match.group(1).replace(',', ''))
+        if self.price_bucket <= 0 or price <= 0:
+            return f"₦{price:g}"
+        return f"₦~{round(math.log(price) / math.log1p(self.price_bucket))}"
+
+    def normalize(self, prompt: str) -> str:
+        text = _PRICE.sub(self._bucket_price, prompt.lower())
+        text = _PUNCTUATION.sub(' ', text)
+        return _WHITESPACE.sub(' ', text).strip()
+
+    def key(self, model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\n{self.normalize(prompt)}".encode('utf-8')).hexdigest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self.path and self._disk is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._disk = sqlite3.connect(self.path, check_same_thread=False)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._disk.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),))
+            self._disk.commit()
+        return self._disk
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is None and self.path:
+                row = self._connect().execute(
+                    "SELECT value FROM llm_cache WHERE key = ? AND expires_at >= ?", (key, time.time())
+                ).fetchone()
+                if row:
+                    value = json.loads(row[0])
+                    self._memory[key] = value
+                    self.disk_hits += 1
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Callers annotate decisions in place; never hand out the cached dict
+            return copy.deepcopy(value)
+
+    def set(self, key: str, value: Dict):
+        with self._lock:
+            self._memory[key] = copy.deepcopy(value)
+            if self.path:
+                disk = self._connect()
+                disk.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), time.time() + self.ttl)
+                )
+                disk.commit()
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self.path:
+                disk = self._connect()
+                disk.execute("DELETE FROM llm_cache")
+                disk.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters (disk_hits are included in hits)"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._memory),
+            }
+
+# Shared by every LlamaClient in the process
+llm_cache = LLMCache(
+    maxsize=int(os.getenv("LLM_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("LLM_CACHE_TTL", str(60 * 60))),
+    price_bucket=float(os.getenv("LLM_CACHE_PRICE_BUCKET", "0.02")),
+    path=os.getenv("LLM_CACHE_PATH") or None
+)
@@ -0,0 +1,63 @@
+from app.models import CompetitorPrice
+from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import Dict, Optional
+from datetime import datetime, timedelta
+
+class MarketStats:
+    """Competitor price aggregates computed in SQL (one GROUP BY over the
+    (product_id, scraped_at) index) instead of loading every row"""
+
+    def _query(self, product_id: int, window_hours: Optional[float] = None):
+        query = select(
+            CompetitorPrice.source,
+            func.count(CompetitorPrice.id),
+            func.avg(CompetitorPrice.price),
+            func.min(CompetitorPrice.price),
+            func.max(CompetitorPrice.price)
+        ).where(CompetitorPrice.product_id == product_id)
+
+        if window_hours:
+            cutoff = datetime.utcnow() - timedelta(hours=window_hours)
+            query = query.where(CompetitorPrice.scraped_at >= cutoff)
+
+        return query.group_by(CompetitorPrice.source)
+
+    def _summarize(self, rows) -> Dict:
+        sources = {
+            source: {"avg": avg, "lowest": lowest, "highest": highest, "count": count}
+            for source, count, avg, lowest, highest in rows
+        }
+        total = sum(s["count"] for s in sources.values())
+        if not total:
+            return {"avg": 0, "lowest": 0, "highest": 0, "count": 0, "sources": {}}
+
+        return {
+            "avg": sum(s["avg"] * s["count"] for s in sources.values()) / total,
+            "lowest": min(s["lowest"] for s in sources.values()),
+            "highest": max(s["highest"] for s in sources.values()),
+            "count": total,
+            "sources": sources
+        }
+
+    def get_stats(
+        self,
+        session: Session,
+        product_id: int,
+        window_hours: Optional[float] = None
+    ) -> Dict:
+        """
+        Overall and per-source competitor prices for a product
+        Returns: {avg, lowest, highest, count, sources: {source: {avg, lowest, highest, count}}}
+        """
+        return self._summarize(session.exec(self._query(product_id, window_hours)).all())
+
+    async def get_stats_async(
+        self,
+        session: AsyncSession,
+        product_id: int,
+        window_hours: Optional[float] = None
+    ) -> Dict:
+        """get_stats on an async session"""
+        result = await session.exec(self._query(product_id, window_hours))
+        return self._summarize(result.all())
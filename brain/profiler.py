@@ -1,93 +1,193 @@
 from brain.llama_client import LlamaClient
+from brain.batch_classifier import batch_classifier
+from brain.intent_matcher import LOCAL_CONFIDENCE_THRESHOLD, IntentMatcher, intent_matcher
 from brain.prompts import INTENT_CLASSIFIER_PROMPT
 from app.models import CustomerType, CustomerTypeSignal, Customer
-from sqlmodel import Session, select
+from sqlmodel import Session, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime, timedelta
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# A signal's weight halves every SCORE_HALF_LIFE_DAYS
+SCORE_HALF_LIFE_DAYS = 10.0
+# Stored signals this recent seed a customer's scores the first time they're needed
+SCORE_SEED_DAYS = 30
+# Conditional score UPDATEs retried when another request changed the row first
+SCORE_UPDATE_ATTEMPTS = 5
+# Most recent LLM-labelled signals the local matcher is fitted on, and the fewest worth fitting
+INTENT_FIT_LIMIT = int(os.getenv("INTENT_FIT_LIMIT", "5000"))
+INTENT_FIT_MIN_SAMPLES = int(os.getenv("INTENT_FIT_MIN_SAMPLES", "50"))
+
+def fit_intent_matcher(session: Session) -> int:
+    """Fit the local matcher on stored LLM classifications; returns the sample count.
+    Locally classified signals are left out, or the matcher would learn from itself."""
+    signals = session.exec(
+        select(CustomerTypeSignal)
+        .where(CustomerTypeSignal.source == "llm")
+        .order_by(CustomerTypeSignal.detected_at.desc())
+        .limit(INTENT_FIT_LIMIT)
+    ).all()
+    if len(signals) < INTENT_FIT_MIN_SAMPLES:
+        logger.info(f"Intent matcher keeps its phrase priors ({len(signals)} LLM-labelled signals)")
+        return 0
+    
+    # Fit from the priors on a fresh matcher, then swap the weights in
+    fitted = IntentMatcher()
+    fitted.fit([s.signal_text for s in signals], [s.signal_type.value for s in signals])
+    intent_matcher.weights, intent_matcher.bias = fitted.weights, fitted.bias
+    logger.info(f"Intent matcher fitted on {len(signals)} LLM-labelled signals")
+    return len(signals)
 
 class CustomerProfiler:
     def __init__(self):
         self.llama = LlamaClient()
-        
-        # Fallback keyword matching
-        self.price_keywords = [
-            "last price", "how much last", "reduce", "too cost", 
-            "can you drop", "cheaper", "I see am for", "too much"
-        ]
-        self.quality_keywords = [
-            "original", "na original", "strong", "which model", 
-            "warranty", "how long", "fake", "real", "durable"
-        ]
+        self.matcher = intent_matcher
+        self.local_threshold = LOCAL_CONFIDENCE_THRESHOLD
     
     def classify_message(self, message: str) -> dict:
-        """Classify customer message using Llama 3"""
+        """Classify customer message locally; only ambiguous ones go to Llama 3"""
+        local = self._keyword_classify(message)
+        if local["confidence"] >= self.local_threshold:
+            return local
+        
         prompt = INTENT_CLASSIFIER_PROMPT.format(message=message)
         result = self.llama.generate_json(prompt)
         
         if result:
-            return result
+            return dict(result, source="llm")
+        
+        # Fall back to the local answer
+        return local
+    
+    async def classify_message_async(self, message: str) -> dict:
+        """classify_message on the async LLM client; concurrent escalations share one
+        batched request unless INTENT_BATCH_ENABLED=false"""
+        local = self._keyword_classify(message)
+        if local["confidence"] >= self.local_threshold:
+            return local
         
-        # Fallback to keyword matching
-        return self._keyword_classify(message)
+        if os.getenv("INTENT_BATCH_ENABLED", "true").lower() in ("1", "true", "yes"):
+            try:
+                result = await batch_classifier.classify(message)
+            except Exception:
+                # Logged by the batch; the local answer stands in
+                result = None
+        else:
+            result = await self.llama.generate_json_async(INTENT_CLASSIFIER_PROMPT.format(message=message))
+        return dict(result, source="llm") if result else local
     
     def _keyword_classify(self, message: str) -> dict:
-        """Fallback keyword-based classification"""
-        message_lower = message.lower()
+        """Local phrase-matcher classification (see brain/intent_matcher.py)"""
+        return dict(self.matcher.classify(message), source="local")
+    
+    def update_customer_profile(self, session: Session, customer: Customer, message: str):
+        """Analyze message and update customer profile.
+        Only adds to the session - the caller commits once per inbound message."""
+        classification = self.classify_message(message)
         
-        price_score = sum(1 for kw in self.price_keywords if kw in message_lower)
-        quality_score = sum(1 for kw in self.quality_keywords if kw in message_lower)
+        seed = []
+        if customer.scores_updated_at is None:
+            seed = session.exec(self._recent_signals_query(customer.id)).all()
+        signal = self._build_signal(customer, message, classification)
+        session.add(signal)
         
-        if price_score > quality_score:
-            return {
-                "customer_type": "price_sensitive",
-                "confidence": min(0.6 + (price_score * 0.1), 0.9),
-                "key_signals": [kw for kw in self.price_keywords if kw in message_lower]
-            }
-        elif quality_score > price_score:
-            return {
-                "customer_type": "quality_sensitive",
-                "confidence": min(0.6 + (quality_score * 0.1), 0.9),
-                "key_signals": [kw for kw in self.quality_keywords if kw in message_lower]
-            }
+        for _ in range(SCORE_UPDATE_ATTEMPTS):
+            updated = session.execute(self._score_update(customer, seed, signal)).rowcount
+            # Picks up our update, or the concurrent one that beat it
+            session.refresh(customer)
+            if updated:
+                break
         else:
-            return {
-                "customer_type": "unknown",
-                "confidence": 0.5,
-                "key_signals": []
-            }
+            logger.warning(f"Customer {customer.id} scores not updated: too many concurrent signals")
+        return classification
     
-    def update_customer_profile(self, session: Session, customer_id: int, message: str):
-        """Analyze message and update customer profile"""
-        classification = self.classify_message(message)
+    async def update_customer_profile_async(self, session: AsyncSession, customer: Customer, message: str):
+        """update_customer_profile on an async session and the async LLM client"""
+        classification = await self.classify_message_async(message)
         
-        # Store signal
-        signal = CustomerTypeSignal(
-            customer_id=customer_id,
-            signal_text=message,
-            signal_type=CustomerType(classification["customer_type"]),
-            confidence=classification["confidence"]
-        )
+        seed = []
+        if customer.scores_updated_at is None:
+            seed = (await session.exec(self._recent_signals_query(customer.id))).all()
+        signal = self._build_signal(customer, message, classification)
         session.add(signal)
         
-        # Update customer type based on recent signals
-        recent_signals = session.exec(
+        for _ in range(SCORE_UPDATE_ATTEMPTS):
+            updated = (await session.execute(self._score_update(customer, seed, signal))).rowcount
+            await session.refresh(customer)
+            if updated:
+                break
+        else:
+            logger.warning(f"Customer {customer.id} scores not updated: too many concurrent signals")
+        return classification
+    
+    def _recent_signals_query(self, customer_id: int):
+        return (
             select(CustomerTypeSignal)
             .where(CustomerTypeSignal.customer_id == customer_id)
-            .where(CustomerTypeSignal.detected_at > datetime.utcnow() - timedelta(days=30))
-        ).all()
+            .where(CustomerTypeSignal.detected_at > datetime.utcnow() - timedelta(days=SCORE_SEED_DAYS))
+            .order_by(CustomerTypeSignal.detected_at)
+        )
+    
+    def _build_signal(self, customer: Customer, message: str, classification: dict) -> CustomerTypeSignal:
+        return CustomerTypeSignal(
+            customer_id=customer.id,
+            signal_text=message,
+            signal_type=CustomerType(classification["customer_type"]),
+            confidence=classification["confidence"],
+            source=classification.get("source")
+        )
+    
+    def _score_update(self, customer: Customer, seed, signal: CustomerTypeSignal):
+        """UPDATE applying `signal` to the scores as loaded on `customer`.
         
-        if len(recent_signals) >= 2:
-            # Calculate weighted average
-            price_score = sum(s.confidence for s in recent_signals if s.signal_type == CustomerType.PRICE_SENSITIVE)
-            quality_score = sum(s.confidence for s in recent_signals if s.signal_type == CustomerType.QUALITY_SENSITIVE)
-            
-            customer = session.get(Customer, customer_id)
-            if customer:
-                if price_score > quality_score:
-                    customer.customer_type = CustomerType.PRICE_SENSITIVE
-                elif quality_score > price_score:
-                    customer.customer_type = CustomerType.QUALITY_SENSITIVE
-                customer.last_interaction = datetime.utcnow()
-                session.add(customer)
+        signal_count doubles as a version column: the UPDATE only matches if no
+        other request changed the scores since they were read, so concurrent
+        webhooks for one customer can't overwrite each other's signals.
+        """
+        scores = {
+            "price_score": customer.price_score,
+            "quality_score": customer.quality_score,
+            "signal_count": customer.signal_count,
+            "scores_updated_at": customer.scores_updated_at,
+            "customer_type": customer.customer_type,
+        }
+        if customer.scores_updated_at is None:
+            # One-off: build running scores from signals stored before customers had them
+            scores.update(price_score=0.0, quality_score=0.0, signal_count=0)
+            for old in seed:
+                self._apply_signal(scores, old.signal_type, old.confidence, old.detected_at)
+        self._apply_signal(scores, signal.signal_type, signal.confidence, signal.detected_at)
         
-        session.commit()
-        return classification
+        return (
+            update(Customer)
+            .where(Customer.id == customer.id)
+            .where(Customer.signal_count == customer.signal_count)
+            .values(last_interaction=signal.detected_at, **scores)
+            # The refresh after the UPDATE loads the new values
+            .execution_options(synchronize_session=False)
+        )
+    
+    def _apply_signal(self, scores: dict, signal_type: CustomerType, confidence: float, at: datetime):
+        """Decay the running scores to `at`, add the signal and re-derive the customer type - O(1)"""
+        if scores["scores_updated_at"] is not None:
+            elapsed_days = max((at - scores["scores_updated_at"]).total_seconds(), 0) / 86400
+            decay = 0.5 ** (elapsed_days / SCORE_HALF_LIFE_DAYS)
+            scores["price_score"] *= decay
+            scores["quality_score"] *= decay
+        
+        if signal_type == CustomerType.PRICE_SENSITIVE:
+            scores["price_score"] += confidence
+        elif signal_type == CustomerType.QUALITY_SENSITIVE:
+            scores["quality_score"] += confidence
+        scores["signal_count"] += 1
+        scores["scores_updated_at"] = at
+        
+        # Need at least two signals before labelling a customer
+        if scores["signal_count"] >= 2:
+            if scores["price_score"] > scores["quality_score"]:
+                scores["customer_type"] = CustomerType.PRICE_SENSITIVE
+            elif scores["quality_score"] > scores["price_score"]:
+                scores["customer_type"] = CustomerType.QUALITY_SENSITIVE
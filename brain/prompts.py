@@ -49,6 +49,34 @@ Respond in JSON format:
 }}
 """
 
+BATCH_INTENT_CLASSIFIER_PROMPT = """You are a customer intent classifier for Nigerian e-commerce.
+
+Classify EACH numbered customer message below as:
+1. PRICE_SENSITIVE - cares about getting the lowest price
+2. QUALITY_SENSITIVE - cares about originality, warranty, durability
+
+Price-Sensitive Signals:
+- "last price", "how much last", "reduce am", "too cost", "can you drop", "I see am for", "cheaper"
+
+Quality-Sensitive Signals:
+- "is it original", "na original", "this one strong", "which model", "warranty", "how long e go last", "fake or real"
+
+Customer Messages:
+{messages}
+
+Respond in JSON format with exactly one result per message, using its number as "id":
+{{
+    "results": [
+        {{
+            "id": <message number>,
+            "customer_type": "price_sensitive" or "quality_sensitive" or "unknown",
+            "confidence": <0.0 to 1.0>,
+            "key_signals": ["signal1", "signal2"]
+        }}
+    ]
+}}
+"""
+
 VALUE_REINFORCEMENT_TEMPLATE = """Hello {customer_name}!
 
 {product_name} - ₦{price}
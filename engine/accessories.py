@@ -0,0 +1,50 @@
+"""
+NAIRA SNIPER - ACCESSORY FILTER
+Tells phone/gadget listings apart from cases, chargers and screen protectors
+"""
+import re
+from typing import Optional, Set
+
+ACCESSORY_KEYWORDS = [
+    'case', 'cover', 'charger', 'cable', 'adapter',
+    'protector', 'pouch', 'holder', 'stand', 'skin',
+    'tempered glass', 'screen protector', 'battery',
+    'casing', 'jack', 'dock', 'mount', 'otterbox',
+    'spigen', 'ring', 'grip', 'strap', 'glass'
+]
+
+# Whole words (plurals too), so "ring" doesn't fire inside "spring"
+_KEYWORD = re.compile(
+    r'\b(' + '|'.join(re.escape(k) for k in sorted(ACCESSORY_KEYWORDS, key=len, reverse=True)) + r')s?\b'
+)
+_FOR_DEVICE = re.compile(r'\bfor\s+(iphone|samsung|android)\b')
+
+
+def accessory_terms(text: str) -> Set[str]:
+    """Accessory keywords that appear in text"""
+    return set(_KEYWORD.findall((text or '').lower()))
+
+
+def is_accessory(name: str, price: Optional[float] = None, product_name: str = '') -> bool:
+    """Whether a listing is likely an accessory rather than the product itself.
+
+    Keywords that also appear in product_name don't count, so a listing can
+    still match a catalog product that is itself an accessory ("iPhone 13 Case").
+    """
+    if accessory_terms(name) - accessory_terms(product_name):
+        return True
+    if accessory_terms(product_name):
+        return False
+
+    name_lower = name.lower()
+    # "... for iPhone 13" is how accessory listings name their device
+    if _FOR_DEVICE.search(name_lower):
+        return True
+
+    # Price-based heuristics
+    if price is not None:
+        if 'iphone' in name_lower and price < 50000:
+            return True  # Too cheap for real iPhone
+        if 'samsung' in name_lower and 'galaxy' in name_lower and price < 30000:
+            return True  # Too cheap for real Samsung
+    return False
@@ -0,0 +1,138 @@
+"""
+NAIRA SNIPER - PRICE ARCHIVE
+Aged prices moved out of SQLite into date-partitioned Parquet files
+
+Layout (hive partitioning, one directory per day a listing was last seen):
+
+    engine/data/archive/date=2025-01-31/part-<first_id>-<last_id>.parquet
+
+Rows keep both timestamps: scraped_at (first seen) and last_seen. Files
+written before last_seen was archived have no such column; there it reads
+as null and scraped_at stands in.
+
+Requires pyarrow.
+"""
+import os
+import logging
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # optional
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_COLUMNS = ['id', 'product_name', 'source', 'title', 'price', 'url', 'rating', 'location',
+                   'scraped_at', 'last_seen']
+
+
+class PriceArchive:
+    """Append-only columnar store for prices that aged out of the hot table"""
+
+    def __init__(self, directory: str = 'engine/data/archive', compression: str = 'zstd'):
+        self.directory = directory
+        self.compression = compression
+
+    @property
+    def available(self) -> bool:
+        return pa is not None
+
+    def _schema(self):
+        return pa.schema([
+            ('id', pa.int64()),
+            ('product_name', pa.string()),
+            ('source', pa.string()),
+            ('title', pa.string()),
+            ('price', pa.float64()),
+            ('url', pa.string()),
+            ('rating', pa.string()),
+            ('location', pa.string()),
+            ('scraped_at', pa.timestamp('us')),
+            ('last_seen', pa.timestamp('us')),
+        ])
+
+    def write(self, rows: List[Dict]) -> int:
+        """Write rows (dicts with ARCHIVE_COLUMNS) into their day partitions"""
+        if not self.available:
+            raise RuntimeError("pyarrow is required for the price archive")
+
+        # Filed under the day the listing was last seen, i.e. when it aged out
+        by_day: Dict[date, List[Dict]] = {}
+        for row in rows:
+            by_day.setdefault((row.get('last_seen') or row['scraped_at']).date(), []).append(row)
+
+        schema = self._schema()
+        for day, day_rows in by_day.items():
+            partition = os.path.join(self.directory, f"date={day.isoformat()}")
+            os.makedirs(partition, exist_ok=True)
+            ids = [row['id'] for row in day_rows]
+            # Named by id range, so a retried batch overwrites instead of duplicating
+            path = os.path.join(partition, f"part-{min(ids)}-{max(ids)}.parquet")
+
+            table = pa.Table.from_pylist(
+                [{column: row.get(column) for column in ARCHIVE_COLUMNS} for row in day_rows],
+                schema=schema
+            )
+            tmp_path = f"{path}.tmp"
+            pq.write_table(table, tmp_path, compression=self.compression)
+            os.replace(tmp_path, path)
+
+        return len(rows)
+
+    def scan_table(
+        self,
+        product_name: Optional[str] = None,
+        source: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columns: Optional[List[str]] = None
+    ):
+        """Archived rows as a pyarrow Table.
+
+        start/end select listings that were up at some point in [start, end):
+        last seen at or after start, first scraped before end. Only start can
+        skip day partitions, since a listing first scraped before end may have
+        been seen (and filed) long after it.
+        """
+        if not self.available:
+            raise RuntimeError("pyarrow is required for the price archive")
+        if not os.path.isdir(self.directory):
+            return self._schema().empty_table().select(columns or ARCHIVE_COLUMNS)
+
+        dataset = ds.dataset(
+            # Explicit schema, so files from before last_seen was archived still load
+            self.directory, format='parquet', schema=self._schema().append(pa.field('date', pa.string())),
+            partitioning=ds.partitioning(pa.schema([('date', pa.string())]), flavor='hive'),
+            exclude_invalid_files=True
+        )
+        conditions = []
+        if start:
+            last_seen = pc.coalesce(ds.field('last_seen'), ds.field('scraped_at'))
+            conditions.append(ds.field('date') >= start.date().isoformat())
+            conditions.append(last_seen >= pa.scalar(start, pa.timestamp('us')))
+        if end:
+            conditions.append(ds.field('scraped_at') < pa.scalar(end, pa.timestamp('us')))
+        if product_name:
+            conditions.append(ds.field('product_name') == product_name)
+        if source:
+            conditions.append(ds.field('source') == source)
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return dataset.to_table(columns=columns or ARCHIVE_COLUMNS, filter=expression)
+
+    def scan(self, product_name: Optional[str] = None, source: Optional[str] = None,
+             start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict]:
+        """Archived rows as dicts, oldest first"""
+        table = self.scan_table(product_name, source, start, end)
+        return sorted(table.to_pylist(), key=lambda row: (row['scraped_at'], row['id']))
+
+
+# Global instance
+price_archive = PriceArchive(os.getenv("PRICE_ARCHIVE_DIR", "engine/data/archive"))
@@ -0,0 +1,217 @@
+"""
+NAIRA SNIPER - CATALOG BRIDGE
+Streams scraped ProductPrice rows into the catalog's CompetitorPrice table
+"""
+import re
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, and_, or_, select
+
+from app.models import CompetitorPrice, IngestCursor, Product
+from engine.accessories import is_accessory
+from engine.database import PriceDatabase, ProductPrice
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+# Share of a catalog product's name tokens a scraped row must contain
+MATCH_THRESHOLD = 0.75
+
+# A matched row priced below this share of the product's floor price is a
+# mis-match (a part, a deposit, a typo), not a competitor's offer
+MIN_PRICE_RATIO = 0.5
+
+
+def tokenize(text: str) -> Set[str]:
+    return set(_TOKEN.findall((text or '').lower()))
+
+
+class CatalogIndex:
+    """Inverted token index over catalog product names (models break ties)"""
+
+    def __init__(self, products: Iterable[Product], threshold: float = MATCH_THRESHOLD):
+        self.threshold = threshold
+        self._names: Dict[int, Set[str]] = {}
+        self._models: Dict[int, Set[str]] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self.products: Dict[int, Product] = {}
+        for product in products:
+            name_tokens = tokenize(product.name)
+            if not name_tokens:
+                continue
+            self.products[product.id] = product
+            self._names[product.id] = name_tokens
+            self._models[product.id] = tokenize(product.model) - name_tokens
+            for token in name_tokens:
+                self._postings.setdefault(token, set()).add(product.id)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def match(self, *texts: str) -> Optional[int]:
+        """Catalog product id best covered by the tokens of texts, if any"""
+        tokens = set().union(*(tokenize(text) for text in texts))
+        candidates = set().union(*(self._postings.get(token, ()) for token in tokens))
+
+        best, best_key = None, (0.0, 0, 0)
+        for product_id in candidates:
+            name = self._names[product_id]
+            matched = len(name & tokens)
+            score = matched / len(name)
+            # Prefer the most specific product ("iPhone 13 Pro" over "iPhone 13"),
+            # then the one whose model number also appears
+            key = (score, matched, len(self._models[product_id] & tokens))
+            if score >= self.threshold and key > best_key:
+                best, best_key = product_id, key
+        return best
+
+    def plausible(self, product_id: int, title: str, price: float) -> bool:
+        """Whether a matched row is really an offer for the product: not an
+        accessory for it, and not priced far below what it could sell for"""
+        product = self.products[product_id]
+        if is_accessory(title or '', product_name=product.name):
+            return False
+        reference = product.floor_price or product.current_price
+        return not reference or price >= reference * MIN_PRICE_RATIO
+
+
+class CatalogBridge:
+    """Maps new scraped prices to catalog products and bulk-writes CompetitorPrice rows.
+
+    Progress is an IngestCursor (highest ProductPrice id seen) committed
+    with each batch, so runs resume where the last one stopped. Stored
+    prices that a later scrape found again (last_seen bumped) are written
+    as fresh observations, tracked by a second cursor on last_seen.
+    """
+
+    CURSOR_NAME = "product_prices"
+    SEEN_CURSOR_NAME = "product_prices_seen"
+
+    def __init__(self, price_db: PriceDatabase, app_engine=None, batch_size: int = 1000):
+        from app.database import add_missing_columns
+        if app_engine is None:
+            from app.database import engine as app_engine
+        self.price_db = price_db
+        self.app_engine = app_engine
+        self.batch_size = batch_size
+        # The scheduler may start before the API has created the catalog tables
+        tables = [Product.__table__, CompetitorPrice.__table__, IngestCursor.__table__]
+        SQLModel.metadata.create_all(app_engine, tables=tables)
+        add_missing_columns(app_engine, tables)
+
+    def _load_index(self, session: Session) -> CatalogIndex:
+        return CatalogIndex(session.exec(select(Product)).all())
+
+    def _read_batch(self, after_id: int) -> List[ProductPrice]:
+        with Session(self.price_db.engine) as session:
+            return session.exec(
+                select(ProductPrice)
+                .where(ProductPrice.id > after_id)
+                .order_by(ProductPrice.id)
+                .limit(self.batch_size)
+            ).all()
+
+    def _read_seen_batch(self, seen_at: datetime, after_id: int) -> List[ProductPrice]:
+        """Re-seen prices after the (last_seen, id) position, oldest first"""
+        with Session(self.price_db.engine) as session:
+            return session.exec(
+                select(ProductPrice)
+                .where(ProductPrice.last_seen > ProductPrice.scraped_at)
+                .where(or_(
+                    ProductPrice.last_seen > seen_at,
+                    and_(ProductPrice.last_seen == seen_at, ProductPrice.id > after_id)
+                ))
+                .order_by(ProductPrice.last_seen, ProductPrice.id)
+                .limit(self.batch_size)
+            ).all()
+
+    def _observations(self, batch: List[ProductPrice], index: CatalogIndex,
+                      matches: Dict[str, Optional[int]], stats: Dict[str, int], seen: bool) -> List[Dict]:
+        rows = []
+        for price in batch:
+            key = f"{price.product_name}\n{price.title}"
+            if key not in matches:
+                matches[key] = index.match(price.product_name, price.title)
+            product_id = matches[key]
+            if product_id is None:
+                stats["unmatched"] += 1
+                continue
+            # "iPhone 13 Silicone Case" matches "iPhone 13" but would drag its market price down
+            if not index.plausible(product_id, price.title, price.price):
+                stats["rejected"] += 1
+                continue
+            observed_at = price.last_seen if seen else price.scraped_at
+            rows.append({
+                "product_id": product_id,
+                "source": price.source.capitalize(),
+                "price": price.price,
+                "url": price.url,
+                # Scraper stamps local time; the catalog uses UTC
+                "scraped_at": observed_at.astimezone(timezone.utc).replace(tzinfo=None),
+            })
+        return rows
+
+    def run(self) -> Dict[str, int]:
+        """Ingest every scraped row added (or found again) since the last run"""
+        stats = {"read": 0, "ingested": 0, "unmatched": 0, "rejected": 0}
+
+        with Session(self.app_engine) as session:
+            index = self._load_index(session)
+            if not len(index):
+                logger.info("🔗 Catalog is empty, nothing to map scraped prices to")
+                return stats
+
+            cursor = session.get(IngestCursor, self.CURSOR_NAME) or IngestCursor(name=self.CURSOR_NAME)
+            seen_cursor = session.get(IngestCursor, self.SEEN_CURSOR_NAME)
+            if seen_cursor is None:
+                # Re-sightings from before this cursor existed are history, not news
+                seen_cursor = IngestCursor(name=self.SEEN_CURSOR_NAME, seen_at=datetime.now())
+            matches: Dict[str, Optional[int]] = {}
+
+            while True:
+                batch = self._read_batch(cursor.last_id)
+                if not batch:
+                    break
+
+                rows = self._observations(batch, index, matches, stats, seen=False)
+                if rows:
+                    session.execute(insert(CompetitorPrice), rows)
+                cursor.last_id = batch[-1].id
+                cursor.updated_at = datetime.utcnow()
+                session.add(cursor)
+                # Rows and cursor commit together, so a crash never double-ingests
+                session.commit()
+
+                stats["read"] += len(batch)
+                stats["ingested"] += len(rows)
+
+            while True:
+                batch = self._read_seen_batch(seen_cursor.seen_at, seen_cursor.last_id)
+                if not batch:
+                    break
+
+                rows = self._observations(batch, index, matches, stats, seen=True)
+                if rows:
+                    session.execute(insert(CompetitorPrice), rows)
+                seen_cursor.seen_at = batch[-1].last_seen
+                seen_cursor.last_id = batch[-1].id
+                seen_cursor.updated_at = datetime.utcnow()
+                session.add(seen_cursor)
+                session.commit()
+
+                stats["read"] += len(batch)
+                stats["ingested"] += len(rows)
+
+            if seen_cursor not in session:
+                session.add(seen_cursor)
+                session.commit()
+
+        if stats["read"]:
+            logger.info(f"🔗 Catalog bridge: {stats['ingested']}/{stats['read']} scraped prices "
+                        f"mapped to products ({stats['unmatched']} unmatched, "
+                        f"{stats['rejected']} rejected as accessories or implausible prices)")
+        return stats
@@ -2,10 +2,17 @@
 NAIRA SNIPER - DATABASE
 SQLite database for storing prices
 """
-from sqlmodel import SQLModel, Field, Session, create_engine, select
+from sqlmodel import SQLModel, Field, Session, select
+from sqlalchemy import Index, case, delete, func, inspect, text
 from typing import Optional, List, Dict
 from datetime import datetime, timedelta
 import os
+import threading
+
+from cachetools import TTLCache
+
+from app.db_engine import create_db_engine
+from engine.archive import ARCHIVE_COLUMNS, PriceArchive, price_archive
 
 class ProductPrice(SQLModel, table=True):
     __tablename__ = "product_prices"
@@ -18,66 +25,298 @@ class ProductPrice(SQLModel, table=True):
     url: Optional[str] = None
     rating: Optional[str] = None
     location: Optional[str] = None
-    scraped_at: datetime = Field(default_factory=datetime.now, index=True)
+    scraped_at: datetime = Field(default_factory=datetime.now, index=True)  # first seen
+    last_seen: datetime = Field(default_factory=datetime.now, index=True)  # latest scrape that found it
+
+
+# A price is stored once per product, source and listing title
+PRICE_IDENTITY_COLUMNS = ['product_name', 'source', 'title', 'price']
+PRICE_IDENTITY_INDEX = Index(
+    'uq_product_prices_identity',
+    *(ProductPrice.__table__.c[column] for column in PRICE_IDENTITY_COLUMNS),
+    unique=True
+)
+
+
+class PriceRollup(SQLModel, table=True):
+    """Open/high/low/close per product, source and hour or day bucket"""
+    __tablename__ = "price_rollups"
+    
+    product_name: str = Field(primary_key=True)
+    source: str = Field(primary_key=True)
+    period: str = Field(primary_key=True)  # 'hour' or 'day'
+    bucket_start: datetime = Field(primary_key=True)
+    open_price: float
+    high_price: float
+    low_price: float
+    close_price: float
+    price_sum: float
+    price_count: int
+    first_at: datetime
+    last_at: datetime
+
+
+ROLLUP_PERIODS = ('hour', 'day')
+ROLLUP_KEY = ['product_name', 'source', 'period', 'bucket_start']
+
+
+def _bucket_start(at: datetime, period: str) -> datetime:
+    if period == 'hour':
+        return at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _rollup_rows(prices) -> List[Dict]:
+    """Fold (product_name, source, price, scraped_at) tuples, oldest first, into rollup rows"""
+    buckets = {}
+    for product_name, source, price, at in prices:
+        for period in ROLLUP_PERIODS:
+            key = (product_name, source, period, _bucket_start(at, period))
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = {
+                    'product_name': product_name, 'source': source,
+                    'period': period, 'bucket_start': key[3],
+                    'open_price': price, 'high_price': price, 'low_price': price, 'close_price': price,
+                    'price_sum': price, 'price_count': 1,
+                    'first_at': at, 'last_at': at,
+                }
+                continue
+            bucket['high_price'] = max(bucket['high_price'], price)
+            bucket['low_price'] = min(bucket['low_price'], price)
+            bucket['close_price'] = price
+            bucket['price_sum'] += price
+            bucket['price_count'] += 1
+            bucket['last_at'] = at
+    return list(buckets.values())
 
 
 class PriceDatabase:
     """Database manager"""
     
-    def __init__(self, db_url: str = None):
-        if not db_url:
+    def __init__(self, db_url: str = None, engine=None):
+        if engine is not None:
+            db_url = str(engine.url)
+        elif not db_url:
             # Store DB in engine/data folder
             os.makedirs('engine/data', exist_ok=True)
             db_url = "sqlite:///./engine/data/prices.db"
         
-        self.engine = create_engine(db_url)
+        self.engine = engine if engine is not None else create_db_engine(db_url)
+        
+        # Read-through cache for get_latest_prices, invalidated on writes.
+        # The TTL only matters when another process writes the same database.
+        self._latest_cache = TTLCache(
+            maxsize=int(os.getenv("PRICE_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("PRICE_CACHE_TTL", str(30 * 60)))
+        )
+        self._cache_lock = threading.Lock()
+        self._cache_generation = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
         
         # Create tables
         SQLModel.metadata.create_all(self.engine)
+        self._ensure_last_seen()
+        self._ensure_identity_index()
+        self._backfill_rollups()
         print(f"✅ Database initialized: {db_url}")
     
-    def save_prices(self, product_name: str, results: Dict[str, List[Dict]]):
-        """Save scraped prices to database"""
-        with Session(self.engine) as session:
-            total_saved = 0
-            
-            for source, items in results.items():
-                if not items:
+    def _ensure_last_seen(self):
+        """Add last_seen to databases created before it existed"""
+        columns = {column['name'] for column in inspect(self.engine).get_columns('product_prices')}
+        if 'last_seen' in columns:
+            return
+        with self.engine.begin() as conn:
+            column_type = ProductPrice.__table__.c.last_seen.type.compile(self.engine.dialect)
+            conn.execute(text(f"ALTER TABLE product_prices ADD COLUMN last_seen {column_type}"))
+            conn.execute(text("UPDATE product_prices SET last_seen = scraped_at"))
+        for index in ProductPrice.__table__.indexes:
+            if 'last_seen' in index.columns:
+                index.create(self.engine, checkfirst=True)
+    
+    def _ensure_identity_index(self, archive: PriceArchive = None, batch_size: int = 10000):
+        """Add the unique identity index to databases created before it existed.
+        
+        The index can't be built over the duplicates older versions saved, so
+        every copy but the first of a listing is moved to the Parquet archive
+        (they are real earlier sightings) before it is created.
+        """
+        existing = {index['name'] for index in inspect(self.engine).get_indexes('product_prices')}
+        if PRICE_IDENTITY_INDEX.name in existing:
+            return
+        
+        archive = archive or price_archive
+        table = ProductPrice.__table__
+        first_ids = (
+            select(func.min(table.c.id))
+            .group_by(*(table.c[column] for column in PRICE_IDENTITY_COLUMNS))
+        )
+        removed = 0
+        while True:
+            with self.engine.begin() as conn:
+                rows = conn.execute(
+                    select(*(table.c[column] for column in ARCHIVE_COLUMNS))
+                    .where(table.c.id.not_in(first_ids))
+                    .order_by(table.c.id)
+                    .limit(batch_size)
+                ).mappings().all()
+                if not rows:
+                    break
+                if archive.available:
+                    archive.write([dict(row) for row in rows])
+                conn.execute(delete(table).where(
+                    table.c.id.in_([row['id'] for row in rows])
+                ))
+                removed += len(rows)
+        
+        if removed and archive.available:
+            print(f"🧹 Moved {removed} duplicate prices to {archive.directory} before adding the identity index")
+        elif removed:
+            print(f"⚠️ Deleted {removed} duplicate prices before adding the identity index "
+                  f"(pyarrow not installed, so they were not archived)")
+        PRICE_IDENTITY_INDEX.create(self.engine)
+    
+    def _backfill_rollups(self, batch_size: int = 5000):
+        """Build rollups from raw prices saved before rollups existed"""
+        with self.engine.begin() as conn:
+            if conn.execute(select(PriceRollup.product_name).limit(1)).first():
+                return
+            raw = conn.execute(
+                select(ProductPrice.product_name, ProductPrice.source, ProductPrice.price, ProductPrice.scraped_at)
+                .order_by(ProductPrice.scraped_at, ProductPrice.id)
+                .execution_options(yield_per=batch_size)
+            )
+            total = 0
+            for rows in raw.partitions():
+                self._upsert_rollups(conn, _rollup_rows(rows))
+                total += len(rows)
+        if total:
+            print(f"📊 Backfilled price rollups from {total} stored prices")
+    
+    def _insert(self, table):
+        """INSERT ... ON CONFLICT for the engine's dialect"""
+        if self.engine.dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        return insert(table)
+    
+    def _upsert_rollups(self, conn, rows: List[Dict]):
+        """Merge freshly folded rollup rows into the stored buckets"""
+        if not rows:
+            return
+        table = PriceRollup.__table__
+        stmt = self._insert(table)
+        new = stmt.excluded
+        stmt = stmt.on_conflict_do_update(index_elements=ROLLUP_KEY, set_={
+            'open_price': case((new.first_at < table.c.first_at, new.open_price), else_=table.c.open_price),
+            'close_price': case((new.last_at >= table.c.last_at, new.close_price), else_=table.c.close_price),
+            'high_price': case((new.high_price > table.c.high_price, new.high_price), else_=table.c.high_price),
+            'low_price': case((new.low_price < table.c.low_price, new.low_price), else_=table.c.low_price),
+            'price_sum': table.c.price_sum + new.price_sum,
+            'price_count': table.c.price_count + new.price_count,
+            'first_at': case((new.first_at < table.c.first_at, new.first_at), else_=table.c.first_at),
+            'last_at': case((new.last_at > table.c.last_at, new.last_at), else_=table.c.last_at),
+        })
+        conn.execute(stmt, rows)
+    
+    def ingest(self, product_name: str, results: Dict[str, List[Dict]]) -> Dict[str, int]:
+        """Bulk insert a scrape's results. Prices already stored just get their
+        last_seen bumped, so listings that are still up stay fresh (items reused
+        from an unchanged page included). Returns the number of new rows per source."""
+        scraped_at = datetime.now()
+        rows = {}
+        for source, items in results.items():
+            for item in items or []:
+                if not item.get('price'):
                     continue
-                
-                for item in items:
-                    if not item.get('price'):
-                        continue
-                    
-                    # Check for duplicates
-                    existing = session.exec(
-                        select(ProductPrice).where(
-                            ProductPrice.product_name == product_name,
-                            ProductPrice.source == source,
-                            ProductPrice.title == item.get('name', '')[:100],
-                            ProductPrice.price == item['price']
-                        ).limit(1)
-                    ).first()
-                    
-                    if not existing:
-                        price_record = ProductPrice(
-                            product_name=product_name,
-                            source=source,
-                            title=item.get('name', 'Unknown')[:200],
-                            price=item['price'],
-                            url=item.get('url'),
-                            rating=item.get('rating'),
-                            location=item.get('location'),
-                        )
-                        session.add(price_record)
-                        total_saved += 1
-            
-            session.commit()
-            print(f"💾 Saved {total_saved} new prices to database")
-            return total_saved
+                title = (item.get('name') or 'Unknown')[:200]
+                rows.setdefault((source, title, item['price']), {
+                    'product_name': product_name,
+                    'source': source,
+                    'title': title,
+                    'price': item['price'],
+                    'url': item.get('url'),
+                    'rating': item.get('rating'),
+                    'location': item.get('location'),
+                    'scraped_at': scraped_at,
+                    'last_seen': scraped_at,
+                })
+        
+        inserted = {source: 0 for source in results}
+        if not rows:
+            return inserted
+        
+        table = ProductPrice.__table__
+        stmt = self._insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=PRICE_IDENTITY_COLUMNS,
+            set_={'last_seen': stmt.excluded.last_seen}
+        ).returning(table.c.source, table.c.price, table.c.scraped_at)
+        
+        with self.engine.begin() as conn:
+            # executemany; RETURNING yields inserted and refreshed rows alike -
+            # only inserted ones were first seen by this scrape
+            written = conn.execute(stmt, list(rows.values())).all()
+            new_prices = [(source, price) for source, price, first_seen in written if first_seen == scraped_at]
+            for source, _ in new_prices:
+                inserted[source] += 1
+            # Roll the new rows into their hour/day buckets in the same transaction
+            self._upsert_rollups(conn, _rollup_rows(
+                (product_name, source, price, scraped_at) for source, price in new_prices
+            ))
+        self._invalidate_latest(product_name)
+        return inserted
+    
+    def save_prices(self, product_name: str, results: Dict[str, List[Dict]]) -> int:
+        """Save scraped prices to database"""
+        inserted = self.ingest(product_name, results)
+        total_saved = sum(inserted.values())
+        print(f"💾 Saved {total_saved} new prices to database")
+        return total_saved
+    
+    def _invalidate_latest(self, product_name: str = None):
+        """Drop cached latest prices for a product (and unfiltered queries), or everything"""
+        with self._cache_lock:
+            self._cache_generation += 1
+            if product_name is None:
+                self._latest_cache.clear()
+                return
+            for key in [key for key in self._latest_cache if key[0] in (product_name, None)]:
+                del self._latest_cache[key]
+    
+    def cache_stats(self) -> Dict[str, float]:
+        """Hit/miss counters for the latest-prices cache"""
+        with self._cache_lock:
+            total = self.cache_hits + self.cache_misses
+            return {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'hit_rate': self.cache_hits / total if total else 0.0,
+                'entries': len(self._latest_cache),
+            }
     
     def get_latest_prices(self, product_name: str = None, source: str = None, limit: int = 50):
-        """Get latest prices from database"""
+        """Get latest prices (served from cache until the next write)"""
+        key = (product_name or None, source or None, limit)
+        with self._cache_lock:
+            cached = self._latest_cache.get(key)
+            if cached is not None:
+                self.cache_hits += 1
+                return list(cached)
+            self.cache_misses += 1
+            generation = self._cache_generation
+        
+        results = self._query_latest_prices(product_name, source, limit)
+        
+        with self._cache_lock:
+            # Skip caching if a write landed while we were querying
+            if generation == self._cache_generation:
+                self._latest_cache[key] = results
+        return list(results)
+    
+    def _query_latest_prices(self, product_name: str = None, source: str = None, limit: int = 50):
         with Session(self.engine) as session:
             query = select(ProductPrice)
             
@@ -86,45 +325,98 @@ class PriceDatabase:
             if source:
                 query = query.where(ProductPrice.source == source)
             
-            query = query.order_by(ProductPrice.scraped_at.desc()).limit(limit)
+            query = query.order_by(ProductPrice.last_seen.desc()).limit(limit)
             
             results = session.exec(query).all()
             return results
     
-    def get_price_stats(self, product_name: str):
-        """Get price statistics for a product"""
+    def get_price_stats(self, product_name: str, days: Optional[int] = None):
+        """Get price statistics for a product (from the daily rollups)"""
         with Session(self.engine) as session:
-            from sqlalchemy.sql import func
-            
-            stats = session.exec(
-                select(
-                    ProductPrice.source,
-                    func.count(ProductPrice.id).label('count'),
-                    func.avg(ProductPrice.price).label('avg_price'),
-                    func.min(ProductPrice.price).label('min_price'),
-                    func.max(ProductPrice.price).label('max_price')
-                ).where(
-                    ProductPrice.product_name == product_name
-                ).group_by(
-                    ProductPrice.source
-                )
-            ).all()
+            query = select(
+                PriceRollup.source,
+                func.sum(PriceRollup.price_count).label('count'),
+                (func.sum(PriceRollup.price_sum) / func.sum(PriceRollup.price_count)).label('avg_price'),
+                func.min(PriceRollup.low_price).label('min_price'),
+                func.max(PriceRollup.high_price).label('max_price')
+            ).where(
+                PriceRollup.product_name == product_name,
+                PriceRollup.period == 'day'
+            )
+            if days:
+                cutoff = _bucket_start(datetime.now() - timedelta(days=days), 'day')
+                query = query.where(PriceRollup.bucket_start >= cutoff)
             
+            stats = session.exec(query.group_by(PriceRollup.source)).all()
             return stats
     
-    def cleanup_old_data(self, days: int = 7):
-        """Remove data older than X days"""
+    def get_price_history(self, product_name: str, source: str = None, period: str = 'day',
+                          since: datetime = None) -> List[Dict]:
+        """OHLC price history per source, oldest bucket first"""
+        if period not in ROLLUP_PERIODS:
+            raise ValueError(f"period must be one of {ROLLUP_PERIODS}")
+        
         with Session(self.engine) as session:
-            from sqlalchemy import delete
-            
-            cutoff = datetime.utcnow() - timedelta(days=days)
-            
-            stmt = delete(ProductPrice).where(
-                ProductPrice.scraped_at < cutoff
+            query = select(PriceRollup).where(
+                PriceRollup.product_name == product_name,
+                PriceRollup.period == period
             )
+            if source:
+                query = query.where(PriceRollup.source == source)
+            if since:
+                query = query.where(PriceRollup.bucket_start >= _bucket_start(since, period))
             
-            result = session.exec(stmt)
-            session.commit()
-            
-            print(f"🧹 Cleaned up {result.rowcount} old records")
-            return result.rowcount
\ No newline at end of file
+            buckets = session.exec(query.order_by(PriceRollup.bucket_start, PriceRollup.source)).all()
+            return [
+                {
+                    'source': bucket.source,
+                    'bucket_start': bucket.bucket_start,
+                    'open': bucket.open_price,
+                    'high': bucket.high_price,
+                    'low': bucket.low_price,
+                    'close': bucket.close_price,
+                    'avg': bucket.price_sum / bucket.price_count,
+                    'count': bucket.price_count,
+                }
+                for bucket in buckets
+            ]
+    
+    def cleanup_old_data(self, days: int = 7, archive: PriceArchive = None, batch_size: int = 10000):
+        """Move raw prices not seen for X days to the Parquet archive (rollups are kept)"""
+        archive = archive or price_archive
+        if not archive.available:
+            print("⚠️ pyarrow not installed, keeping old prices instead of archiving them")
+            return 0
+        
+        cutoff = datetime.now() - timedelta(days=days)
+        table = ProductPrice.__table__
+        moved = 0
+        
+        while True:
+            with self.engine.begin() as conn:
+                rows = conn.execute(
+                    select(*(table.c[column] for column in ARCHIVE_COLUMNS))
+                    .where(table.c.last_seen < cutoff)
+                    .order_by(table.c.id)
+                    .limit(batch_size)
+                ).mappings().all()
+                if not rows:
+                    break
+                
+                # Only delete once the batch is safely on disk
+                archive.write([dict(row) for row in rows])
+                conn.execute(delete(table).where(
+                    table.c.id.in_([row['id'] for row in rows])
+                ))
+                moved += len(rows)
+        
+        if moved:
+            self._invalidate_latest()
+        
+        if moved and self.engine.dialect.name == 'sqlite':
+            # Give the freed pages back instead of leaving the file fragmented
+            with self.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                conn.execute(text("VACUUM"))
+        
+        print(f"🧹 Archived {moved} old records to {archive.directory}")
+        return moved
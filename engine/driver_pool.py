@@ -0,0 +1,325 @@
+"""
+NAIRA SNIPER - WEBDRIVER POOL
+Warm Chrome drivers leased to the Selenium scrapers
+"""
+import os
+import atexit
+import threading
+import logging
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+
+from engine.replay import transport
+
+logger = logging.getLogger(__name__)
+
+
+def create_chrome_driver(headless: bool = True):
+    """Start a stealth-configured Chrome driver"""
+    options = Options()
+
+    if headless:
+        options.add_argument("--headless")
+
+    # Anti-detection settings
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+    # Stealth mode
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+
+    # Catalina-compatible options
+    options.add_argument("--disable-software-rasterizer")
+
+    try:
+        service = Service(ChromeDriverManager().install())
+        driver = webdriver.Chrome(service=service, options=options)
+
+        # Execute stealth script
+        driver.execute_script("""
+            Object.defineProperty(navigator, 'webdriver', {
+                get: () => undefined
+            });
+        """)
+
+        logger.info("✅ Selenium driver initialized")
+        return driver
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize Selenium: {e}")
+        raise
+
+
+def _process_tree_rss_mb(root_pid: int) -> Optional[float]:
+    """Resident memory of a process and all its descendants, from /proc
+    (None where /proc isn't available). Shared pages count once per process,
+    so this overstates Chrome's real footprint somewhat."""
+    try:
+        children: Dict[int, List[int]] = {}
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # The command name can contain spaces; fields resume after its ')'
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    except OSError:
+        return None
+
+    total_kb = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
+
+
+class DriverBudget:
+    """Caps Chrome processes across every pool sharing it.
+
+    At most `size` drivers are leased at once, and a pool that needs a new
+    driver while `size` are running quits another pool's idle one first.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.slots = threading.BoundedSemaphore(size)
+        self.pools: List["DriverPool"] = []
+        self._live = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, pool: "DriverPool", evict: bool = True) -> bool:
+        """Claim room for one more driver in `pool` (False if full and not evicting)"""
+        victim = owner = None
+        with self._lock:
+            if self._live >= self.size:
+                if not evict:
+                    return False
+                for other in self.pools:
+                    if other is not pool:
+                        victim = other._pop_idle()
+                        if victim is not None:
+                            owner = other
+                            break
+            # The victim's room passes straight to the new driver
+            if victim is None:
+                self._live += 1
+        if victim is not None:
+            logger.info("♻️ Quitting an idle driver to make room for another pool")
+            owner._quit_driver(victim, release=False)
+        return True
+
+    def release(self):
+        with self._lock:
+            self._live -= 1
+
+
+class DriverPool:
+    """Fixed-size pool of warm WebDrivers.
+
+    Drivers are health-checked when leased and recycled after
+    max_page_loads navigations or once the driver's processes (chromedriver,
+    Chrome and its renderers) hold more than max_memory_mb resident. Where
+    /proc isn't available, the current page's JS heap (performance.memory)
+    is checked instead, which misses memory held outside the page.
+
+    Pools given the same DriverBudget share `size` between them.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        headless: bool = True,
+        max_page_loads: int = 50,
+        max_memory_mb: int = 1024,
+        driver_factory: Optional[Callable] = None,
+        budget: Optional[DriverBudget] = None
+    ):
+        self.size = size
+        self.headless = headless
+        self.max_page_loads = max_page_loads
+        self.max_memory_mb = max_memory_mb
+        self.driver_factory = driver_factory or create_chrome_driver
+        self.budget = budget or DriverBudget(size)
+        self.budget.pools.append(self)
+        self._idle = deque()
+        self._page_loads: Dict[int, int] = {}
+        self._slots = self.budget.slots
+        self._lock = threading.Lock()
+
+    def _start_driver(self, evict: bool = True):
+        """Start a driver within the budget (None if it's full and evict is False)"""
+        if not self.budget.reserve(self, evict):
+            return None
+        try:
+            driver = self.driver_factory(self.headless)
+        except BaseException:
+            self.budget.release()
+            raise
+        with self._lock:
+            self._page_loads[id(driver)] = 0
+        return driver
+
+    def _quit_driver(self, driver, release: bool = True):
+        with self._lock:
+            self._page_loads.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Driver quit failed: {e}")
+        if release:
+            self.budget.release()
+
+    def _pop_idle(self):
+        with self._lock:
+            return self._idle.popleft() if self._idle else None
+
+    def warm(self, count: int = 1):
+        """Pre-start drivers so the first lease is instant. Raises if Chrome can't start."""
+        with self._lock:
+            missing = min(count, self.size) - len(self._page_loads)
+        for _ in range(max(missing, 0)):
+            # Warming never evicts another pool's drivers
+            driver = self._start_driver(evict=False)
+            if driver is None:
+                break
+            with self._lock:
+                self._idle.append(driver)
+
+    def _is_healthy(self, driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _memory_mb(self, driver) -> float:
+        """Resident memory of the driver's process tree, else the page's JS heap"""
+        try:
+            rss = _process_tree_rss_mb(driver.service.process.pid)
+        except AttributeError:
+            # No local chromedriver process (remote or replayed driver)
+            rss = None
+        if rss is not None:
+            return rss
+        try:
+            used = driver.execute_script(
+                "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : 0"
+            )
+            return (used or 0) / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+    def _should_recycle(self, driver) -> bool:
+        with self._lock:
+            loads = self._page_loads.get(id(driver), 0)
+        if loads >= self.max_page_loads:
+            logger.info(f"♻️ Recycling driver after {loads} page loads")
+            return True
+        memory = self._memory_mb(driver)
+        if memory >= self.max_memory_mb:
+            logger.info(f"♻️ Recycling driver using {memory:.0f}MB")
+            return True
+        return False
+
+    def note_page_load(self, driver):
+        """Count a navigation against the driver's recycle budget"""
+        with self._lock:
+            if id(driver) in self._page_loads:
+                self._page_loads[id(driver)] += 1
+
+    @contextmanager
+    def lease(self, timeout: float = 120):
+        """Borrow a healthy driver for the duration of a with-block"""
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No WebDriver free after {timeout}s")
+
+        driver = None
+        failed = False
+        try:
+            driver = self._pop_idle()
+            if driver is not None and not self._is_healthy(driver):
+                logger.warning("🩺 Pooled driver failed health check, replacing")
+                self._quit_driver(driver)
+                driver = None
+            if driver is None:
+                driver = self._start_driver()
+
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            if driver is not None:
+                if (failed and not self._is_healthy(driver)) or self._should_recycle(driver):
+                    self._quit_driver(driver)
+                else:
+                    with self._lock:
+                        self._idle.append(driver)
+            self._slots.release()
+
+    def drain(self):
+        """Quit idle drivers. Leased drivers stay with their borrowers."""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for driver in idle:
+            self._quit_driver(driver)
+        if idle:
+            logger.info(f"✅ Closed {len(idle)} pooled Selenium drivers")
+
+
+_pools: Dict[bool, DriverPool] = {}
+_pools_lock = threading.Lock()
+_budget: Optional[DriverBudget] = None
+
+
+def get_driver_pool(headless: bool = True) -> DriverPool:
+    """Process-wide pool, one per headless mode. The pools share one budget,
+    so SELENIUM_POOL_SIZE caps Chrome processes across both."""
+    global _budget
+    with _pools_lock:
+        pool = _pools.get(headless)
+        if pool is None:
+            size = int(os.getenv("SELENIUM_POOL_SIZE", "2"))
+            if _budget is None:
+                _budget = DriverBudget(size)
+            pool = DriverPool(
+                size=size,
+                headless=headless,
+                max_page_loads=int(os.getenv("SELENIUM_MAX_PAGE_LOADS", "50")),
+                max_memory_mb=int(os.getenv("SELENIUM_MAX_MEMORY_MB", "1024")),
+                driver_factory=transport.driver_factory(create_chrome_driver),
+                budget=_budget,
+            )
+            _pools[headless] = pool
+        return pool
+
+
+@atexit.register
+def shutdown_driver_pools():
+    """Quit every pooled driver"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.drain()
@@ -0,0 +1,107 @@
+"""
+NAIRA SNIPER - HTML PARSER
+Pluggable parser backends behind one BeautifulSoup-style interface
+
+Backends (set HTML_PARSER):
+- lxml:        BeautifulSoup on the lxml tree builder (default)
+- html.parser: BeautifulSoup on the pure-Python builder
+- selectolax:  lexbor via selectolax (optional dependency, fastest)
+
+Scrapers only use the common subset: select, select_one, get_text,
+get, [attr], name and str().
+"""
+import os
+import logging
+from typing import List, Optional
+
+from bs4 import BeautifulSoup
+
+from engine.profiling import timed
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('lxml', 'html.parser', 'selectolax')
+
+
+class LexborNode:
+    """Wraps a selectolax node with the BeautifulSoup methods scrapers use"""
+
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    @property
+    def name(self) -> str:
+        return self._node.tag
+
+    def select(self, selector: str) -> List['LexborNode']:
+        # lexbor matches the node itself; BeautifulSoup only searches descendants
+        own_id = self._node.mem_id
+        return [LexborNode(n) for n in self._node.css(selector) if n.mem_id != own_id]
+
+    def select_one(self, selector: str) -> Optional['LexborNode']:
+        found = self.select(selector)
+        return found[0] if found else None
+
+    def get_text(self, separator: str = '', strip: bool = False) -> str:
+        return self._node.text(deep=True, separator=separator, strip=strip)
+
+    def get(self, attr: str, default=None):
+        value = self._node.attributes.get(attr)
+        return default if value is None else value
+
+    def __getitem__(self, attr: str):
+        value = self._node.attributes.get(attr)
+        if value is None:
+            raise KeyError(attr)
+        return value
+
+    def __str__(self) -> str:
+        return self._node.html or ''
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Pick a backend, falling back when its library isn't installed"""
+    backend = (backend or os.getenv("HTML_PARSER", "lxml")).lower()
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown HTML_PARSER '{backend}', using html.parser")
+        return 'html.parser'
+    if backend == 'selectolax' and LexborHTMLParser is None:
+        logger.warning("selectolax not installed, using lxml")
+        backend = 'lxml'
+    if backend == 'lxml' and not HAS_LXML:
+        backend = 'html.parser'
+    return backend
+
+
+DEFAULT_BACKEND = resolve_backend()
+
+
+@timed('parse')
+def parse_html(html, backend: Optional[str] = None):
+    """Parse a page (or fragment) with the configured backend"""
+    backend = resolve_backend(backend) if backend else DEFAULT_BACKEND
+    if backend == 'selectolax':
+        if isinstance(html, bytes):
+            html = html.decode('utf-8', errors='replace')
+        return LexborNode(LexborHTMLParser(html).root)
+    return BeautifulSoup(html, backend)
+
+
+def first_link(node):
+    """The node itself if it's a link, else its first descendant <a href>"""
+    if node.name == 'a' and node.get('href'):
+        return node
+    return node.select_one('a[href]')
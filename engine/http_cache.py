@@ -0,0 +1,253 @@
+"""
+NAIRA SNIPER - HTTP CACHE
+On-disk conditional-GET cache mounted under the scrapers' requests.Session
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from engine.rate_limiter import DomainRateLimiter, RateLimitedAdapter
+from engine.profiling import stage_timings
+
+logger = logging.getLogger(__name__)
+
+# Freshness per URL pattern (seconds). Category pages are shared by many
+# products, so one fetch should serve a whole 30-minute scrape cycle.
+TTL_RULES: List[Tuple[str, int]] = [
+    (r'/catalog/\?q=', 10 * 60),
+    (r'/search\?', 10 * 60),
+    (r'\?q=', 10 * 60),
+]
+DEFAULT_TTL = 25 * 60
+
+# Don't keep pages that are really block/captcha screens
+BLOCK_MARKERS = (b'captcha', b'access denied')
+
+# Response headers not worth storing (body is stored decoded)
+DROP_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'set-cookie'}
+
+
+class CacheEntry:
+    """A stored response"""
+
+    def __init__(self, key: str, url: str, headers: Dict[str, str], body: bytes,
+                 stored_at: float, ttl: int):
+        self.key = key
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+    def is_fresh(self) -> bool:
+        return time.time() - self.stored_at < self.ttl
+
+    def to_response(self, request) -> Response:
+        """Rebuild a requests.Response from the stored entry"""
+        response = Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.headers['X-Cache'] = 'HIT'
+        response._content = self.body
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        return response
+
+
+class HTTPCache:
+    """SQLite-backed response cache with per-URL TTLs and LRU size eviction"""
+
+    def __init__(self, path: str = 'engine/data/http_cache.db', max_bytes: int = 200 * 1024 * 1024,
+                 ttl_rules: Optional[List[Tuple[str, int]]] = None, default_ttl: int = DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_rules = [(re.compile(pattern), ttl) for pattern, ttl in (ttl_rules or TTL_RULES)]
+        self.default_ttl = default_ttl
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the cache database on first use"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    stored_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_last_access ON entries (last_access)")
+        return self._conn
+
+    def ttl_for(self, url: str) -> int:
+        """Freshness lifetime for a URL"""
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Look up an entry and mark it recently used"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT url, headers, body, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        url, headers, body, stored_at = row
+        return CacheEntry(key, url, json.loads(headers), body, stored_at, self.ttl_for(url))
+
+    def validators(self, key: str) -> Dict[str, str]:
+        """Conditional headers for revalidating an entry"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT etag, last_modified FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers['If-None-Match'] = row[0]
+        if row and row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def put(self, key: str, response: Response):
+        """Store a 200 response"""
+        body = response.content
+        lowered = body[:200000].lower()
+        if any(marker in lowered for marker in BLOCK_MARKERS):
+            return
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in DROP_HEADERS}
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                """INSERT OR REPLACE INTO entries
+                   (key, url, headers, body, etag, last_modified, stored_at, last_access, size)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (key, response.url, json.dumps(headers), body, response.headers.get('ETag'),
+                 response.headers.get('Last-Modified'), now, now, len(body))
+            )
+            conn.commit()
+            self._evict(conn)
+
+    def refresh(self, key: str, response: Response):
+        """Restart an entry's TTL after a 304 Not Modified"""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                """UPDATE entries SET stored_at = ?, last_access = ?,
+                   etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                   WHERE key = ?""",
+                (now, now, response.headers.get('ETag'), response.headers.get('Last-Modified'), key)
+            )
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until under max_bytes"""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        conn.commit()
+        logger.debug(f"🧹 HTTP cache evicted {len(victims)} entries")
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries")
+            conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'revalidated': self.revalidated}
+
+
+class CachingAdapter(RateLimitedAdapter):
+    """Serves fresh GETs from the cache; revalidates stale ones with a conditional GET.
+
+    Cache hits skip the rate limiter entirely since they never reach the network.
+    """
+
+    def __init__(self, cache: Optional[HTTPCache] = None, limiter: Optional[DomainRateLimiter] = None, **kwargs):
+        self.cache = cache or http_cache
+        super().__init__(limiter, **kwargs)
+
+    def _cache_key(self, request) -> str:
+        # Mobile and desktop user agents get different pages for the same URL
+        return f"{request.url} {request.headers.get('User-Agent', '')}"
+
+    def send(self, request, **kwargs):
+        with stage_timings.track('fetch'):
+            return self._send(request, **kwargs)
+
+    def _send(self, request, **kwargs):
+        if request.method != 'GET' or not self.cache.enabled:
+            return super().send(request, **kwargs)
+
+        key = self._cache_key(request)
+        entry = self.cache.get(key)
+        if entry and entry.is_fresh():
+            self.cache.hits += 1
+            logger.debug(f"📦 HTTP cache hit: {request.url}")
+            return entry.to_response(request)
+
+        if entry:
+            request.headers.update(self.cache.validators(key))
+
+        response = super().send(request, **kwargs)
+
+        if entry and response.status_code == 304:
+            self.cache.revalidated += 1
+            self.cache.refresh(key, response)
+            logger.debug(f"♻️ HTTP cache revalidated: {request.url}")
+            return entry.to_response(request)
+
+        self.cache.misses += 1
+        if response.status_code == 200:
+            self.cache.put(key, response)
+        return response
+
+
+# Global instance
+http_cache = HTTPCache(
+    path=os.getenv("HTTP_CACHE_PATH", "engine/data/http_cache.db"),
+    max_bytes=int(os.getenv("HTTP_CACHE_MAX_MB", "200")) * 1024 * 1024,
+)
+http_cache.enabled = os.getenv("HTTP_CACHE_ENABLED", "true").lower() != "false"
@@ -16,6 +16,7 @@ import io
 import requests
 from urllib.parse import urlparse
 import tempfile
+from engine.rate_limiter import rate_limiter
 
 # Configure Tesseract path (for macOS)
 # pytesseract.pytesseract.tesseract_cmd = '/usr/local/bin/tesseract'  # Uncomment if needed
@@ -104,6 +105,7 @@ class InstagramOCRScraper:
     def _download_image(self, url: str):
         """Download image from URL"""
         try:
+            rate_limiter.acquire(url)
             response = requests.get(url, timeout=10)
             response.raise_for_status()
             
@@ -0,0 +1,92 @@
+"""
+NAIRA SNIPER - PAGE DIGESTS
+Content hashes of listing pages so unchanged pages skip re-parsing
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_BETWEEN_TAGS = re.compile(r'>\s+<')
+
+
+class PageDigestStore:
+    """Remembers each page's product-section hash and the items parsed from it"""
+
+    def __init__(self, path: str = 'engine/data/page_digests.db'):
+        self.path = path
+        self.enabled = True
+        self.reused = 0
+        self.parsed = 0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the digest database on first use"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS digests (
+                    url TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    items TEXT NOT NULL,
+                    parsed_at REAL NOT NULL,
+                    checked_at REAL NOT NULL
+                )
+            """)
+        return self._conn
+
+    @staticmethod
+    def digest(elements) -> str:
+        """Hash of the normalized HTML of the product elements"""
+        hasher = hashlib.blake2b(digest_size=16)
+        for element in elements:
+            html = _BETWEEN_TAGS.sub('><', str(element))
+            hasher.update(_WHITESPACE.sub(' ', html).strip().encode('utf-8'))
+        return hasher.hexdigest()
+
+    def lookup(self, url: str, digest: str) -> Optional[List[Dict]]:
+        """Items from the previous parse if the page is unchanged (and mark it fresh)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT digest, items FROM digests WHERE url = ?", (url,)).fetchone()
+            if not row or row[0] != digest:
+                return None
+            conn.execute("UPDATE digests SET checked_at = ? WHERE url = ?", (time.time(), url))
+            conn.commit()
+        self.reused += 1
+
+        checked_at = datetime.now().isoformat()
+        return [dict(item, unchanged=True, checked_at=checked_at) for item in json.loads(row[1])]
+
+    def store(self, url: str, digest: str, items: List[Dict]):
+        """Remember a fresh parse"""
+        self.parsed += 1
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO digests (url, digest, items, parsed_at, checked_at) VALUES (?, ?, ?, ?, ?)",
+                (url, digest, json.dumps(items, ensure_ascii=False), now, now)
+            )
+            conn.commit()
+
+
+# Global instance
+page_digests = PageDigestStore(os.getenv("PAGE_DIGEST_PATH", "engine/data/page_digests.db"))
+page_digests.enabled = os.getenv("PAGE_DIGEST_ENABLED", "true").lower() != "false"
@@ -0,0 +1,79 @@
+"""
+NAIRA SNIPER - STAGE TIMINGS
+Cumulative time spent in fetch / parse / filter across all scraper threads
+"""
+import time
+import threading
+import functools
+from contextlib import contextmanager
+from typing import Dict
+
+
+class StageTimings:
+    """Thread-safe accumulator of seconds and calls per stage.
+
+    Stages nest per thread and each second is billed once, to the innermost
+    stage: parsing inside a fetch-tagged wait counts as parse, and a fetch
+    inside a fetch (a scraper's _load over a timed transport) is one call.
+    """
+
+    def __init__(self):
+        self._seconds: Dict[str, float] = {}
+        self._calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self._seconds[stage] = self._seconds.get(stage, 0.0) + seconds
+            self._calls[stage] = self._calls.get(stage, 0) + 1
+
+    @contextmanager
+    def track(self, stage: str):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        if stack and stack[-1][0] == stage:
+            # Already inside this stage; the outer frame times it
+            yield
+            return
+
+        # [stage, seconds spent in nested stages]
+        frame = [stage, 0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            self.add(stage, elapsed - frame[1])
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                stage: {'seconds': seconds, 'calls': self._calls[stage]}
+                for stage, seconds in self._seconds.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._seconds.clear()
+            self._calls.clear()
+
+
+def timed(stage: str):
+    """Decorator: add the wrapped call's duration to a stage"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timings.track(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Global instance
+stage_timings = StageTimings()
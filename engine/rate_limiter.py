@@ -0,0 +1,133 @@
+"""
+NAIRA SNIPER - RATE LIMITER
+Per-domain token buckets shared by every scraper
+"""
+import os
+import threading
+import time
+import logging
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# (sustained requests per second, burst size) per domain.
+# Subdomains match their parent, e.g. www.jumia.com.ng -> jumia.com.ng
+DEFAULT_LIMITS: Dict[str, Tuple[float, int]] = {
+    'jumia.com.ng': (0.4, 3),
+    'konga.com': (0.3, 2),
+    'jiji.ng': (0.3, 2),
+    # Image CDNs
+    'jumia.is': (2.0, 5),
+    'konga-cdn.com': (2.0, 5),
+    'jiji-static.com': (2.0, 5),
+    'cdninstagram.com': (1.0, 3),
+}
+FALLBACK_LIMIT: Tuple[float, int] = (0.5, 2)
+
+
+class TokenBucket:
+    """Thread-safe token bucket"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            # Tokens may go negative: later callers queue up behind this one
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """Block until a token is available"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class DomainRateLimiter:
+    """One token bucket per domain"""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        self.limits = dict(limits or DEFAULT_LIMITS)
+        self.enabled = True
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, domain: str, rate: float, burst: int):
+        """Set the sustained rate and burst for a domain"""
+        with self._lock:
+            self.limits[domain] = (rate, burst)
+            self._buckets.pop(domain, None)
+
+    def _domain_for(self, host: str) -> str:
+        """Map a host to its configured domain (or itself)"""
+        host = host.lower().split(':')[0]
+        for domain in self.limits:
+            if host == domain or host.endswith('.' + domain):
+                return domain
+        return host
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        """Get (or create) the bucket for a URL's domain"""
+        domain = self._domain_for(urlparse(url).netloc)
+        with self._lock:
+            bucket = self._buckets.get(domain)
+            if bucket is None:
+                rate, burst = self.limits.get(domain, FALLBACK_LIMIT)
+                bucket = TokenBucket(rate, burst)
+                self._buckets[domain] = bucket
+            return bucket
+
+    def acquire(self, url: str):
+        """Wait for this URL's domain budget"""
+        if not self.enabled:
+            return
+        bucket = self.bucket_for(url)
+        wait = bucket.reserve()
+        if wait > 0:
+            logger.debug(f"⏳ Rate limit: waiting {wait:.2f}s for {url}")
+            time.sleep(wait)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """requests adapter that paces every request through the shared limiter"""
+
+    def __init__(self, limiter: Optional[DomainRateLimiter] = None, **kwargs):
+        self.limiter = limiter or rate_limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        self.limiter.acquire(request.url)
+        return super().send(request, **kwargs)
+
+
+def _limits_from_env() -> Dict[str, Tuple[float, int]]:
+    """Read overrides like SCRAPER_RATE_LIMITS="jumia.com.ng=0.5:3,jiji.ng=0.2:1" """
+    limits = dict(DEFAULT_LIMITS)
+    raw = os.getenv("SCRAPER_RATE_LIMITS", "")
+    for entry in filter(None, (part.strip() for part in raw.split(','))):
+        try:
+            domain, spec = entry.split('=')
+            rate, burst = spec.split(':')
+            limits[domain.strip()] = (float(rate), int(burst))
+        except ValueError:
+            logger.warning(f"Ignoring bad rate limit entry: {entry}")
+    return limits
+
+
+# Global instance
+rate_limiter = DomainRateLimiter(_limits_from_env())
@@ -0,0 +1,265 @@
+"""
+NAIRA SNIPER - RECORD / REPLAY TRANSPORT
+Save every HTTP response and Selenium page source, then serve them back
+deterministically so scrapes can be benchmarked offline.
+
+Modes (SCRAPER_TRANSPORT):
+- live:   normal network access (default)
+- record: live, and every response/page source is written to the cassette
+- replay: no network; responses come from the cassette
+
+The cassette directory is SCRAPER_CASSETTE (default engine/data/cassettes/default).
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from selenium.common.exceptions import NoSuchElementException
+
+from engine.html_parser import parse_html
+from engine.http_cache import CachingAdapter, http_cache, DROP_HEADERS
+from engine.rate_limiter import rate_limiter
+from engine.profiling import stage_timings
+
+logger = logging.getLogger(__name__)
+
+MODES = ('live', 'record', 'replay')
+
+
+class Cassette:
+    """Directory of recorded responses keyed by request"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest)
+
+    def save(self, key: str, meta: Dict, body: bytes):
+        """Record one response (the latest recording of a key wins)"""
+        path = self._path(key)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + '.body', 'wb') as f:
+                f.write(body)
+            with open(path + '.json', 'w', encoding='utf-8') as f:
+                json.dump(dict(meta, key=key), f, ensure_ascii=False)
+
+    def load(self, key: str):
+        """Return (meta, body) or None if the key was never recorded"""
+        path = self._path(key)
+        try:
+            with open(path + '.json', 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(path + '.body', 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        return meta, body
+
+
+def _http_key(request) -> str:
+    return f"http {request.method} {request.url} {request.headers.get('User-Agent', '')}"
+
+
+def _driver_key(url: str) -> str:
+    return f"driver {url}"
+
+
+class RecordingAdapter(CachingAdapter):
+    """Live transport that also writes each response to the cassette"""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        self.cassette = cassette
+        super().__init__(http_cache, rate_limiter, **kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in DROP_HEADERS}
+        self.cassette.save(
+            _http_key(request),
+            {'url': request.url, 'status': response.status_code, 'headers': headers},
+            response.content
+        )
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Serves recorded responses; unrecorded requests get a 404"""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        with stage_timings.track('fetch'):
+            recorded = self.cassette.load(_http_key(request))
+
+        response = Response()
+        response.url = request.url
+        response.request = request
+        if recorded is None:
+            logger.warning(f"📼 Not in cassette: {request.url}")
+            response.status_code = 404
+            response.reason = 'Not Recorded'
+            response._content = b''
+            return response
+
+        meta, body = recorded
+        response.status_code = meta['status']
+        response.reason = 'Replayed'
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        return response
+
+
+class RecordingDriver:
+    """Proxies a real WebDriver and records the page source the scraper reads"""
+
+    def __init__(self, driver, cassette: Cassette):
+        self._driver = driver
+        self._cassette = cassette
+        self._requested_url = None
+
+    def get(self, url: str):
+        self._requested_url = url
+        self._driver.get(url)
+
+    @property
+    def page_source(self) -> str:
+        source = self._driver.page_source
+        final_url = self._driver.current_url
+        # ReplayDriver.get() looks pages up by the URL the scraper asked for,
+        # which differs from current_url after a redirect; record both
+        urls = [self._requested_url or final_url]
+        if final_url != urls[0]:
+            urls.append(final_url)
+        # The last read of a URL is the fully scrolled page the scraper parsed
+        for url in urls:
+            self._cassette.save(
+                _driver_key(url),
+                {'url': final_url, 'status': 200, 'headers': {}},
+                source.encode('utf-8')
+            )
+        return source
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+
+class ReplayDriver:
+    """Minimal WebDriver stand-in backed by recorded page sources"""
+
+    # Recorded pages were already fully scrolled
+    STATIC_PAGE = True
+
+    def __init__(self, cassette: Cassette):
+        self._cassette = cassette
+        self.current_url = 'about:blank'
+        self._source = '<html></html>'
+        self._root = None
+
+    def get(self, url: str):
+        self.current_url = url
+        self._root = None
+        # Timed by the scraper's fetch stage (_load), not here
+        recorded = self._cassette.load(_driver_key(url))
+        if recorded is None:
+            logger.warning(f"📼 Page not in cassette: {url}")
+            self._source = '<html></html>'
+        else:
+            # Land on the recorded (post-redirect) URL, as the live browser did
+            self.current_url = recorded[0].get('url', url)
+            self._source = recorded[1].decode('utf-8')
+
+    def refresh(self):
+        self.get(self.current_url)
+
+    @property
+    def page_source(self) -> str:
+        return self._source
+
+    def _tree(self):
+        if self._root is None:
+            self._root = parse_html(self._source)
+        return self._root
+
+    def find_elements(self, by, value):
+        return self._tree().select(value)
+
+    def find_element(self, by, value):
+        found = self._tree().select_one(value)
+        if found is None:
+            raise NoSuchElementException(value)
+        return found
+
+    def execute_script(self, script: str, *args):
+        if 'readyState' in script:
+            return 'complete'
+        if script.strip() == 'return 1':
+            return 1
+        return 0
+
+    def save_screenshot(self, filename: str) -> bool:
+        return False
+
+    def quit(self):
+        pass
+
+
+class Transport:
+    """Current record/replay mode and cassette"""
+
+    def __init__(self, mode: str = 'live', cassette_dir: str = 'engine/data/cassettes/default'):
+        self.mode = 'live'
+        self.cassette: Optional[Cassette] = None
+        self.configure(mode, cassette_dir)
+
+    def configure(self, mode: str, cassette_dir: Optional[str] = None):
+        """Switch mode. Affects scrapers and driver pools created afterwards."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown transport mode: {mode}")
+        self.mode = mode
+        if cassette_dir:
+            self.cassette = Cassette(cassette_dir)
+
+        # Replays never touch the network, so don't pace or cache them
+        rate_limiter.enabled = mode != 'replay'
+        if mode != 'live':
+            logger.info(f"📼 Scraper transport: {mode} ({self.cassette.directory})")
+
+    def adapter(self) -> HTTPAdapter:
+        """Adapter to mount on a scraper session"""
+        if self.mode == 'record':
+            return RecordingAdapter(self.cassette)
+        if self.mode == 'replay':
+            return ReplayAdapter(self.cassette)
+        return CachingAdapter(http_cache, rate_limiter)
+
+    def driver_factory(self, factory: Callable) -> Callable:
+        """Wrap a WebDriver factory for the current mode"""
+        def build(headless: bool):
+            if self.mode == 'replay':
+                return ReplayDriver(self.cassette)
+            driver = factory(headless)
+            if self.mode == 'record':
+                return RecordingDriver(driver, self.cassette)
+            return driver
+        return build
+
+
+# Global instance
+transport = Transport(
+    os.getenv("SCRAPER_TRANSPORT", "live"),
+    os.getenv("SCRAPER_CASSETTE", "engine/data/cassettes/default"),
+)
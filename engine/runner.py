@@ -0,0 +1,170 @@
+"""
+NAIRA SNIPER - SCRAPE RUNNER
+Scrapes a whole catalog concurrently within a cycle deadline
+"""
+import os
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Max concurrent searches per marketplace, across all workers
+DEFAULT_SOURCE_LIMITS = {'jumia': 2, 'jiji': 1, 'konga': 1}
+
+
+def _source_limits_from_env() -> Dict[str, int]:
+    """Read overrides like SCRAPE_SOURCE_LIMITS="jumia=3,konga=2" """
+    limits = dict(DEFAULT_SOURCE_LIMITS)
+    raw = os.getenv("SCRAPE_SOURCE_LIMITS", "")
+    for entry in filter(None, (part.strip() for part in raw.split(','))):
+        try:
+            source, limit = entry.split('=')
+            limits[source.strip()] = int(limit)
+        except ValueError:
+            logger.warning(f"Ignoring bad source limit entry: {entry}")
+    return limits
+
+
+class _Cycle:
+    """Closes at the deadline; after that, late workers drop their results.
+    `saved` holds the products that got to persist before the close."""
+
+    def __init__(self, deadline_at: float):
+        self.deadline_at = deadline_at
+        self.closed = False
+        self.saved = set()
+        self.lock = threading.Lock()
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+
+
+class ScrapeRunner:
+    """Worker pool that scrapes, saves and reports each product"""
+
+    def __init__(
+        self,
+        scraper,
+        database,
+        workers: Optional[int] = None,
+        source_limits: Optional[Dict[str, int]] = None,
+        deadline: Optional[float] = None,
+        max_results: int = 5
+    ):
+        self.scraper = scraper
+        self.database = database
+        self.workers = workers or int(os.getenv("SCRAPE_WORKERS", "4"))
+        self.deadline = deadline or float(os.getenv("SCRAPE_CYCLE_DEADLINE", str(25 * 60)))
+        self.max_results = max_results
+        limits = source_limits or _source_limits_from_env()
+        self._source_slots = {
+            source: threading.BoundedSemaphore(limits.get(source, 1))
+            for source in scraper.scrapers
+        }
+        # Products still being scraped by an earlier cycle's workers
+        self._running = {}
+
+    def run(self, product_names: List[str]) -> Dict[str, Dict]:
+        """Scrape every product; returns an outcome dict per product"""
+        start = time.monotonic()
+        cycle = _Cycle(start + self.deadline)
+        # A straggler from the last cycle is still on this product; don't run it twice
+        busy = {product for product, future in self._running.items() if not future.done()}
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        futures = {
+            product: executor.submit(self._scrape_product, product, cycle)
+            for product in product_names if product not in busy
+        }
+        logger.info(f"🔄 Scraping {len(futures)} products with {self.workers} workers "
+                    f"(deadline {self.deadline:.0f}s)")
+        done, not_done = wait(futures.values(), timeout=self.deadline)
+        # Queued products won't start; running ones stop after their current
+        # source, and their results are dropped rather than saved late
+        executor.shutdown(wait=False, cancel_futures=True)
+        cycle.close()
+        self._running = {product: future for product, future in futures.items() if not future.done()}
+
+        outcomes = {}
+        for product in product_names:
+            future = futures.get(product)
+            if future is None:
+                outcomes[product] = self._outcome(product, 'skipped', error='Still running from the previous cycle')
+            elif future in done or product in cycle.saved:
+                # Finished, or started saving before the close (result() waits for it)
+                try:
+                    outcomes[product] = future.result()
+                except Exception as e:
+                    outcomes[product] = self._outcome(product, 'failed', error=str(e))
+            else:
+                status = 'skipped' if future.cancelled() else 'timeout'
+                outcomes[product] = self._outcome(product, status, error='Cycle deadline reached')
+
+        self._log_summary(outcomes, time.monotonic() - start)
+        return outcomes
+
+    def _scrape_product(self, product: str, cycle: _Cycle) -> Dict:
+        """Scrape all sources for one product, then persist the results"""
+        started = time.monotonic()
+        logger.info(f"🔍 Scraping: {product}")
+
+        results = {}
+        skipped = []
+        for source in self.scraper.scrapers:
+            remaining = cycle.deadline_at - time.monotonic()
+            slot = self._source_slots[source]
+            if remaining <= 0 or not slot.acquire(timeout=remaining):
+                skipped.append(source)
+                results[source] = []
+                continue
+            try:
+                results[source] = self.scraper.scrape_source(source, product, self.max_results)
+            finally:
+                slot.release()
+
+        # Save to file and database, unless the cycle already reported this product as timed out
+        with cycle.lock:
+            late = cycle.closed
+            if not late:
+                cycle.saved.add(product)
+        if late:
+            logger.warning(f"⏰ {product}: finished after the cycle deadline, results dropped")
+            return self._outcome(product, 'timeout', error='Cycle deadline reached',
+                                 elapsed=time.monotonic() - started)
+        self.scraper.save_results(results, product)
+        self.database.save_prices(product, results)
+
+        total_items = sum(len(items) for items in results.values())
+        status = 'partial' if skipped else 'ok'
+        logger.info(f"✅ {product}: {total_items} items")
+        return self._outcome(
+            product, status,
+            items=total_items,
+            sources={source: len(items) for source, items in results.items()},
+            skipped_sources=skipped,
+            elapsed=time.monotonic() - started
+        )
+
+    def _outcome(self, product: str, status: str, items: int = 0, sources: Dict[str, int] = None,
+                 skipped_sources: List[str] = None, error: str = None, elapsed: float = 0.0) -> Dict:
+        return {
+            'product': product,
+            'status': status,
+            'items': items,
+            'sources': sources or {},
+            'skipped_sources': skipped_sources or [],
+            'error': error,
+            'elapsed': round(elapsed, 2),
+        }
+
+    def _log_summary(self, outcomes: Dict[str, Dict], elapsed: float):
+        counts = {}
+        for outcome in outcomes.values():
+            counts[outcome['status']] = counts.get(outcome['status'], 0) + 1
+            if outcome['status'] in ('failed', 'timeout'):
+                logger.error(f"Failed to scrape {outcome['product']}: {outcome['error']}")
+        summary = ', '.join(f"{status}={count}" for status, count in sorted(counts.items()))
+        logger.info(f"📈 Cycle finished in {elapsed:.1f}s: {summary}")
@@ -9,6 +9,8 @@ from datetime import datetime
 import logging
 from .scraper import ScraperManager
 from .database import PriceDatabase
+from .runner import ScrapeRunner
+from .catalog_bridge import CatalogBridge
 
 logger = logging.getLogger(__name__)
 
@@ -18,12 +20,14 @@ class TaskScheduler:
     def __init__(self):
         self.scraper = ScraperManager()
         self.database = PriceDatabase()
+        self.runner = ScrapeRunner(self.scraper, self.database, max_results=5)
+        self.bridge = CatalogBridge(self.database)
         self.running = False
         self.thread = None
         logger.info("⏰ TaskScheduler initialized")
     
     def scrape_products(self, product_names: list = None):
-        """Scrape multiple products"""
+        """Scrape multiple products concurrently; returns per-product outcomes"""
         if not product_names:
             product_names = [
                 "iPhone",
@@ -33,36 +37,15 @@ class TaskScheduler:
                 "airpods"
             ]
         
-        logger.info(f"🔄 Scraping {len(product_names)} products...")
+        outcomes = self.runner.run(product_names)
         
-        all_results = {}
-        for product in product_names:
-            try:
-                logger.info(f"🔍 Scraping: {product}")
-                
-                # Scrape
-                results = self.scraper.scrape_all(product, max_results=5)
-                
-                # Save to file
-                self.scraper.save_results(results, product)
-                
-                # Save to database
-                self.database.save_prices(product, results)
-                
-                # Count items
-                total_items = sum(len(items) for items in results.values())
-                all_results[product] = total_items
-                
-                logger.info(f"✅ {product}: {total_items} items")
-                
-                # Delay between products
-                time.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Failed to scrape {product}: {e}")
-                continue
+        # Feed the new prices to the pricing brain
+        try:
+            self.bridge.run()
+        except Exception as e:
+            logger.error(f"Catalog bridge failed: {e}")
         
-        return all_results
+        return outcomes
     
     def start(self):
         """Start the scheduler in background thread"""
@@ -84,7 +67,7 @@ class TaskScheduler:
         logger.info("📅 Scheduled tasks:")
         logger.info("  - Scrape every 30 minutes")
         logger.info("  - Daily report at 9:00 AM")
-        logger.info("  - Weekly cleanup on Sunday 11 PM")
+        logger.info("  - Weekly archive of old prices on Sunday 11 PM")
     
     def _run(self):
         """Run scheduler loop"""
@@ -0,0 +1,227 @@
+"""
+NAIRA SNIPER - SCRAPE LOG
+Append-only, gzip-compressed JSONL segments for raw scrape results
+
+Records are buffered into blocks of about block_kb (uncompressed) and each
+block is written as one gzip member, so compression works across records
+instead of paying a gzip header per record. A segment is still a valid
+.jsonl.gz file (zcat/gzip.open read it as JSONL), and any record can be
+read by decompressing just its block. Segments rotate at max_segment_mb.
+A small SQLite index maps (product, scraped_at) to (segment, offset,
+length, line): the block's byte range and the record's line within it.
+
+Records in the open block live only in memory until it is written: when it
+fills up, before any read, on close() and at exit.
+"""
+import os
+import re
+import gzip
+import json
+import atexit
+import sqlite3
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_SEGMENT = re.compile(r'^segment-(\d{6})\.jsonl\.gz$')
+
+
+class ScrapeLog:
+    """Size-rotated segment writer with an offset index and streaming readers"""
+
+    def __init__(self, directory: str = 'engine/data/scrape_log', max_segment_mb: int = 64, block_kb: int = 256):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_mb * 1024 * 1024
+        self.block_bytes = block_kb * 1024
+        self._lock = threading.RLock()
+        self._file = None
+        self._segment = None
+        self._index = None
+        # Open block: its lines, their index rows and where it will be written
+        self._block: List[bytes] = []
+        self._block_rows: List[tuple] = []
+        self._block_size = 0
+        self._block_offset = None
+
+    # ---- writing ----
+
+    def _segments(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory) if _SEGMENT.match(name))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._index is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._index = sqlite3.connect(os.path.join(self.directory, 'index.db'), check_same_thread=False)
+            self._index.execute("PRAGMA journal_mode=WAL")
+            self._index.execute("PRAGMA synchronous=NORMAL")
+            self._index.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    product TEXT NOT NULL,
+                    label TEXT,
+                    scraped_at TEXT NOT NULL,
+                    segment TEXT NOT NULL,
+                    offset INTEGER NOT NULL,
+                    length INTEGER NOT NULL,
+                    line INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            columns = {row[1] for row in self._index.execute("PRAGMA table_info(records)")}
+            if 'line' not in columns:
+                # Logs written one member per record: every record is line 0
+                self._index.execute("ALTER TABLE records ADD COLUMN line INTEGER NOT NULL DEFAULT 0")
+            self._index.execute("CREATE INDEX IF NOT EXISTS ix_records_product_time ON records (product, scraped_at)")
+        return self._index
+
+    def _open_segment(self):
+        """Current segment file, rotating once it has reached max_segment_mb
+        (a segment overshoots by at most one block)"""
+        if self._file is None:
+            segments = self._segments()
+            self._segment = segments[-1] if segments else 'segment-000001.jsonl.gz'
+            self._file = open(os.path.join(self.directory, self._segment), 'ab')
+
+        if self._file.tell() >= self.max_segment_bytes:
+            self._file.close()
+            number = int(_SEGMENT.match(self._segment).group(1)) + 1
+            self._segment = f"segment-{number:06d}.jsonl.gz"
+            self._file = open(os.path.join(self.directory, self._segment), 'ab')
+            logger.info(f"🗂️ Scrape log rotated to {self._segment}")
+        return self._file
+
+    def append(self, product_name: str, results: Dict[str, List[Dict]], label: Optional[str] = None) -> str:
+        """Append one scrape; returns its 'segment@offset:line' reference"""
+        scraped_at = datetime.now().isoformat()
+        line = json.dumps({
+            'product': product_name,
+            'label': label,
+            'scraped_at': scraped_at,
+            'results': results,
+        }, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+        with self._lock:
+            if self._block_offset is None:
+                # The block goes at the end of the segment, so its offset is known now
+                os.makedirs(self.directory, exist_ok=True)
+                self._block_offset = self._open_segment().tell()
+            number = len(self._block)
+            self._block.append(line)
+            self._block_rows.append((product_name, label, scraped_at, self._segment, self._block_offset, number))
+            self._block_size += len(line)
+            reference = f"{self._segment}@{self._block_offset}:{number}"
+            if self._block_size >= self.block_bytes:
+                self.flush()
+            return reference
+
+    def flush(self):
+        """Write the open block as one gzip member and index its records"""
+        with self._lock:
+            if not self._block:
+                return
+            data = gzip.compress(b''.join(self._block), mtime=0)
+            index = self._connect()
+            self._file.write(data)
+            self._file.flush()
+            index.executemany(
+                "INSERT INTO records (product, label, scraped_at, segment, offset, length, line) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [row[:5] + (len(data), row[5]) for row in self._block_rows]
+            )
+            index.commit()
+            self._block, self._block_rows = [], []
+            self._block_size = 0
+            self._block_offset = None
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+
+    # ---- reading ----
+
+    def _read_block(self, handle, offset: int, length: int) -> List[bytes]:
+        handle.seek(offset)
+        return gzip.decompress(handle.read(length)).split(b"\n")
+
+    def read(
+        self,
+        product_name: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        label: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """Stream matching records, oldest first, by seeking straight to them"""
+        query = "SELECT segment, offset, length, line FROM records WHERE 1=1"
+        params = []
+        if product_name:
+            query += " AND product = ?"
+            params.append(product_name)
+        if since:
+            query += " AND scraped_at >= ?"
+            params.append(since.isoformat())
+        if until:
+            query += " AND scraped_at < ?"
+            params.append(until.isoformat())
+        if label:
+            query += " AND label = ?"
+            params.append(label)
+        query += " ORDER BY scraped_at"
+
+        with self._lock:
+            self.flush()
+            locations = self._connect().execute(query, params).fetchall()
+
+        handles = {}
+        # Records of one block are usually read together; decompress it once
+        block_key, block = None, None
+        try:
+            for segment, offset, length, line in locations:
+                if segment not in handles:
+                    handles[segment] = open(os.path.join(self.directory, segment), 'rb')
+                if block_key != (segment, offset):
+                    block_key, block = (segment, offset), self._read_block(handles[segment], offset, length)
+                yield json.loads(block[line])
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+    def latest(self, product_name: str, label: Optional[str] = None) -> Optional[Dict]:
+        """Most recent record for a product"""
+        query = "SELECT segment, offset, length, line FROM records WHERE product = ?"
+        params = [product_name]
+        if label:
+            query += " AND label = ?"
+            params.append(label)
+        with self._lock:
+            self.flush()
+            row = self._connect().execute(query + " ORDER BY scraped_at DESC LIMIT 1", params).fetchone()
+        if not row:
+            return None
+        with open(os.path.join(self.directory, row[0]), 'rb') as handle:
+            return json.loads(self._read_block(handle, row[1], row[2])[row[3]])
+
+    def scan(self) -> Iterator[Dict]:
+        """Stream every record in write order without the index (e.g. to rebuild it)"""
+        self.flush()
+        for segment in self._segments():
+            with gzip.open(os.path.join(self.directory, segment), 'rt', encoding='utf-8') as f:
+                for line in f:
+                    yield json.loads(line)
+
+
+# Global instance
+scrape_log = ScrapeLog(
+    os.getenv("SCRAPE_LOG_DIR", "engine/data/scrape_log"),
+    max_segment_mb=int(os.getenv("SCRAPE_LOG_SEGMENT_MB", "64")),
+    block_kb=int(os.getenv("SCRAPE_LOG_BLOCK_KB", "256"))
+)
+atexit.register(scrape_log.flush)
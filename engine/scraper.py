@@ -3,15 +3,17 @@ NAIRA SNIPER - MAIN SCRAPER
 Complete Jumia + Jiji + Konga scraper
 """
 import requests
-from bs4 import BeautifulSoup
 import logging
-import time
 import random
 from typing import List, Dict, Optional
-import json
-import os
 from datetime import datetime
 import re
+from engine.html_parser import parse_html, first_link
+from engine.replay import transport
+from engine.profiling import timed
+from engine.page_digest import page_digests
+from engine.singleflight import single_flight
+from engine.scrape_log import scrape_log
 
 # Setup logging
 logging.basicConfig(
@@ -40,10 +42,26 @@ class BaseScraper:
             'Accept-Encoding': 'gzip, deflate',
         }
         self.session.headers.update(headers)
+        self._mount_adapters()
     
-    def _random_delay(self):
-        """Random delay to avoid blocking"""
-        time.sleep(random.uniform(2, 4))
+    def _mount_adapters(self):
+        """Serve repeat GETs from the HTTP cache and pace the rest per domain
+        (or record/replay them, depending on the transport mode)"""
+        adapter = transport.adapter()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def _parse_page(self, key: str, elements, parse) -> List[Dict]:
+        """parse(elements), unless the page's product section hasn't changed
+        since the last run - then the previous items are reused"""
+        digest = page_digests.digest(elements)
+        reused = page_digests.lookup(key, digest)
+        if reused is not None:
+            logger.info(f"♻️ Page unchanged, reusing {len(reused)} items: {key}")
+            return reused
+        results = parse(elements)
+        page_digests.store(key, digest, results)
+        return results
     
     def _extract_price(self, text: str) -> Optional[float]:
         """Extract numeric price from text"""
@@ -70,6 +88,7 @@ class JumiaScraper(BaseScraper):
     
     BASE_URL = "https://www.jumia.com.ng"
     
+    @single_flight
     def search_product(self, product_name: str, max_results: int = 10) -> List[Dict]:
         """Search product on Jumia"""
         logger.info(f"🛍️  Searching Jumia: {product_name}")
@@ -78,11 +97,10 @@ class JumiaScraper(BaseScraper):
             search_query = product_name.replace(' ', '-')
             url = f"{self.BASE_URL}/catalog/?q={search_query}"
             
-            self._random_delay()
             response = self.session.get(url, timeout=15)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text)
             
             # Find products
             products = soup.select('article.prd')[:max_results]
@@ -94,15 +112,7 @@ class JumiaScraper(BaseScraper):
             logger.info(f"📦 Found {len(products)} products on Jumia")
             
             # Parse products
-            results = []
-            for product in products:
-                try:
-                    data = self._parse_product(product)
-                    if data and data.get('price'):
-                        results.append(data)
-                except Exception as e:
-                    logger.error(f"Jumia parse error: {e}")
-                    continue
+            results = self._parse_page(url, products, self._parse_products)
             
             logger.info(f"✅ Jumia: Parsed {len(results)} products")
             return results
@@ -111,6 +121,20 @@ class JumiaScraper(BaseScraper):
             logger.error(f"❌ Jumia search failed: {e}")
             return []
     
+    def _parse_products(self, products) -> List[Dict]:
+        """Parse Jumia product elements"""
+        results = []
+        for product in products:
+            try:
+                data = self._parse_product(product)
+                if data and data.get('price'):
+                    results.append(data)
+            except Exception as e:
+                logger.error(f"Jumia parse error: {e}")
+                continue
+        return results
+    
+    @timed('parse')
     def _parse_product(self, product) -> Optional[Dict]:
         """Parse Jumia product element"""
         try:
@@ -175,6 +199,7 @@ class JijiScraper(BaseScraper):
     
     BASE_URL = "https://jiji.ng"
     
+    @single_flight
     def search_product(self, product_name: str, max_results: int = 10) -> List[Dict]:
         """Search Jiji with multiple strategies"""
         logger.info(f"🛍️  Searching Jiji: {product_name}")
@@ -201,7 +226,6 @@ class JijiScraper(BaseScraper):
             search_query = product_name.replace(' ', '+')
             url = f"{self.BASE_URL}/search?query={search_query}"
             
-            self._random_delay()
             response = self.session.get(url, timeout=15)
             
             # Check for blocking
@@ -209,7 +233,7 @@ class JijiScraper(BaseScraper):
             if any(blocked in page_text for blocked in ['captcha', 'cloudflare', 'access denied']):
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text)
             
             # Try different selectors
             selectors = [
@@ -231,17 +255,20 @@ class JijiScraper(BaseScraper):
                 return []
             
             # Parse listings
-            results = []
-            for listing in listings:
-                data = self._parse_listing(listing)
-                if data and data.get('price'):
-                    results.append(data)
-            
-            return results
+            return self._parse_page(url, listings, self._parse_listings)
             
         except:
             return []
     
+    def _parse_listings(self, listings) -> List[Dict]:
+        """Parse Jiji listing elements"""
+        results = []
+        for listing in listings:
+            data = self._parse_listing(listing)
+            if data and data.get('price'):
+                results.append(data)
+        return results
+    
     def _try_mobile_site(self, product_name: str, max_results: int) -> List[Dict]:
         """Try Jiji mobile site"""
         try:
@@ -253,13 +280,12 @@ class JijiScraper(BaseScraper):
             search_query = product_name.replace(' ', '+')
             url = f"{self.BASE_URL}/search?query={search_query}"
             
-            self._random_delay()
-            response = requests.get(url, headers=mobile_headers, timeout=15)
+            response = self.session.get(url, headers=mobile_headers, timeout=15)
             
             if response.status_code != 200:
                 return []
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text)
             
             # Look for mobile listings
             listings = []
@@ -278,18 +304,22 @@ class JijiScraper(BaseScraper):
             if not listings:
                 return []
             
-            # Parse mobile listings
-            results = []
-            for listing in listings:
-                data = self._parse_mobile_listing(listing)
-                if data and data.get('price'):
-                    results.append(data)
-            
-            return results
+            # Parse mobile listings (the mobile page differs from desktop at the same URL)
+            return self._parse_page(f"mobile:{url}", listings, self._parse_mobile_listings)
             
         except:
             return []
     
+    def _parse_mobile_listings(self, listings) -> List[Dict]:
+        """Parse Jiji mobile listing elements"""
+        results = []
+        for listing in listings:
+            data = self._parse_mobile_listing(listing)
+            if data and data.get('price'):
+                results.append(data)
+        return results
+    
+    @timed('parse')
     def _parse_listing(self, listing) -> Optional[Dict]:
         """Parse Jiji listing"""
         try:
@@ -332,6 +362,7 @@ class JijiScraper(BaseScraper):
         except:
             return None
     
+    @timed('parse')
     def _parse_mobile_listing(self, listing) -> Optional[Dict]:
         """Parse mobile Jiji listing"""
         try:
@@ -440,6 +471,7 @@ class KongaScraper(BaseScraper):
     
     BASE_URL = "https://www.konga.com"
     
+    @single_flight
     def search_product(self, product_name: str, max_results: int = 10) -> List[Dict]:
         """Search product on Konga - WORKING VERSION"""
         logger.info(f"🛍️  Searching Konga: {product_name}")
@@ -452,7 +484,6 @@ class KongaScraper(BaseScraper):
             
             logger.info(f"🌐 Fetching: {url}")
             
-            self._random_delay()
             response = self.session.get(url, timeout=15)
             response.raise_for_status()
             
@@ -463,7 +494,7 @@ class KongaScraper(BaseScraper):
                 logger.warning("Konga is blocking requests")
                 return results
             
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = parse_html(html)
             
             # Konga product selectors - FROM WORKING VERSION
             selectors = [
@@ -485,7 +516,7 @@ class KongaScraper(BaseScraper):
             if not products:
                 logger.warning("❌ Konga: No products found with selectors")
                 # Try alternative: look for any product links
-                product_links = soup.find_all('a', href=lambda x: x and '/product/' in x)
+                product_links = soup.select('a[href*="/product/"]')
                 if product_links:
                     products = product_links[:max_results]
                     logger.info(f"✅ Konga: Found {len(products)} product links")
@@ -494,20 +525,7 @@ class KongaScraper(BaseScraper):
             
             logger.info(f"📦 Konga: Parsing {len(products)} products")
             
-            for i, product in enumerate(products):
-                try:
-                    product_data = self._parse_product(product)
-                    if product_data and product_data.get('price'):
-                        results.append(product_data)
-                        logger.debug(f"✅ Parsed Konga product {i+1}/{len(products)}")
-                        
-                except Exception as e:
-                    logger.error(f"❌ Error parsing Konga product {i+1}: {e}")
-                    continue
-                
-                # Small delay between parsing
-                if i < len(products) - 1:
-                    time.sleep(random.uniform(0.3, 1.0))
+            results = self._parse_page(url, products, self._parse_products)
             
             logger.info(f"✅ Konga: Successfully parsed {len(results)}/{len(products)} products")
             
@@ -516,15 +534,26 @@ class KongaScraper(BaseScraper):
         
         return results
     
+    def _parse_products(self, products) -> List[Dict]:
+        """Parse Konga product elements"""
+        results = []
+        for i, product in enumerate(products):
+            try:
+                product_data = self._parse_product(product)
+                if product_data and product_data.get('price'):
+                    results.append(product_data)
+                    logger.debug(f"✅ Parsed Konga product {i+1}/{len(products)}")
+                    
+            except Exception as e:
+                logger.error(f"❌ Error parsing Konga product {i+1}: {e}")
+                continue
+        return results
+    
+    @timed('parse')
     def _parse_product(self, product_element) -> Optional[Dict]:
         """Parse individual Konga product - FROM WORKING VERSION"""
         try:
-            if hasattr(product_element, 'prettify'):
-                product_html = product_element.prettify()
-            else:
-                product_html = str(product_element)
-            
-            soup = BeautifulSoup(product_html, 'html.parser')
+            soup = product_element
             
             # Extract name - FROM WORKING VERSION
             name = "N/A"
@@ -578,7 +607,7 @@ class KongaScraper(BaseScraper):
             
             # Extract URL
             url = ""
-            link_elem = soup.find('a', href=True)
+            link_elem = first_link(soup)
             if link_elem:
                 url = link_elem['href']
                 if url and not url.startswith('http'):
@@ -586,7 +615,7 @@ class KongaScraper(BaseScraper):
             
             # Extract image
             image_url = ""
-            img_elem = soup.find('img', src=True)
+            img_elem = soup.select_one('img[src]')
             if img_elem:
                 image_url = img_elem.get('src', '')
                 if image_url.startswith('//'):
@@ -635,16 +664,28 @@ class ScraperManager:
         self.jumia = JumiaScraper()
         self.jiji = JijiScraper()
         self.konga = KongaScraper()
+        self.scrapers = {
+            'jumia': self.jumia,
+            'jiji': self.jiji,
+            'konga': self.konga,
+        }
         logger.info("📊 ScraperManager initialized with 3 scrapers")
     
+    def scrape_source(self, source: str, product_name: str, max_results: int = 10) -> List[Dict]:
+        """Scrape a single marketplace"""
+        try:
+            return self.scrapers[source].search_product(product_name, max_results)
+        except Exception as e:
+            logger.error(f"❌ {source.capitalize()} failed: {e}")
+            return []
+    
     def scrape_all(self, product_name: str, max_results: int = 10) -> Dict[str, List[Dict]]:
         """Scrape from all marketplaces"""
         logger.info(f"🎯 Starting scrape for: {product_name}")
         
         results = {
-            'jumia': self.jumia.search_product(product_name, max_results),
-            'jiji': self.jiji.search_product(product_name, max_results),
-            'konga': self.konga.search_product(product_name, max_results),
+            source: self.scrape_source(source, product_name, max_results)
+            for source in self.scrapers
         }
         
         # Log summary
@@ -658,18 +699,11 @@ class ScraperManager:
         return results
     
     def save_results(self, results: Dict[str, List[Dict]], product_name: str):
-        """Save results to JSON file"""
-        os.makedirs('engine/data', exist_ok=True)
-        
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"engine/data/{product_name.replace(' ', '_')}_{timestamp}.json"
-        
+        """Append results to the scrape log"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
-            
-            logger.info(f"💾 Saved results to {filename}")
-            return filename
+            location = scrape_log.append(product_name, results, label='basic')
+            logger.info(f"💾 Saved results to {location}")
+            return location
             
         except Exception as e:
             logger.error(f"Save failed: {e}")
@@ -1,22 +1,24 @@
 # engine/scraper_v2.py - ENHANCED VERSION WITH SELENIUM
 import requests
-from bs4 import BeautifulSoup
 import logging
-import time
-import random
 from typing import List, Dict, Optional
-import json
-import os
 from datetime import datetime
 import re
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import threading
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException
+from engine.rate_limiter import rate_limiter
+from engine.html_parser import parse_html, first_link
+from engine.accessories import is_accessory
+from engine.replay import transport
+from engine.profiling import timed
+from engine.page_digest import page_digests
+from engine.singleflight import single_flight
+from engine.scrape_log import scrape_log
+from engine.driver_pool import DriverPool, get_driver_pool, shutdown_driver_pools
 
 # Setup logging
 logging.basicConfig(
@@ -44,10 +46,26 @@ class BaseScraper:
             'Accept-Language': 'en-US,en;q=0.9',
         }
         self.session.headers.update(headers)
+        self._mount_adapters()
     
-    def _random_delay(self):
-        """Random delay to avoid blocking"""
-        time.sleep(random.uniform(2, 4))
+    def _mount_adapters(self):
+        """Serve repeat GETs from the HTTP cache and pace the rest per domain
+        (or record/replay them, depending on the transport mode)"""
+        adapter = transport.adapter()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def _parse_page(self, key: str, elements, parse) -> List[Dict]:
+        """parse(elements), unless the page's product section hasn't changed
+        since the last run - then the previous items are reused"""
+        digest = page_digests.digest(elements)
+        reused = page_digests.lookup(key, digest)
+        if reused is not None:
+            logger.info(f"♻️ Page unchanged, reusing {len(reused)} items: {key}")
+            return reused
+        results = parse(elements)
+        page_digests.store(key, digest, results)
+        return results
     
     def _extract_price(self, text: str) -> Optional[float]:
         """Extract numeric price from text"""
@@ -71,6 +89,12 @@ class JumiaScraper(BaseScraper):
     
     BASE_URL = "https://www.jumia.com.ng"
     
+    # Strategies run two at a time in the order listed; the later ones only
+    # start if the earlier ones haven't found max_results high-scoring items
+    STRATEGY_WORKERS = 2
+    HIGH_SCORE_THRESHOLD = 50.0
+    
+    @single_flight
     def search_product(self, product_name: str, max_results: int = 10) -> List[Dict]:
         """Search product on Jumia - ROBUST VERSION"""
         logger.info(f"🔍 Searching Jumia ROBUSTLY for: {product_name}")
@@ -86,30 +110,7 @@ class JumiaScraper(BaseScraper):
             self._search_direct_category,  # Direct category
         ]
         
-        all_results = []
-        for strategy in strategies:
-            if len(all_results) >= max_results:
-                break
-                
-            try:
-                results = strategy(clean_query, product_name, max_results)
-                if results:
-                    logger.info(f"✅ Strategy found {len(results)} items")
-                    all_results.extend(results)
-                    
-                    # Remove duplicates
-                    seen = set()
-                    unique_results = []
-                    for item in all_results:
-                        key = (item['name'][:50], item['price'])
-                        if key not in seen:
-                            seen.add(key)
-                            unique_results.append(item)
-                    all_results = unique_results
-                    
-            except Exception as e:
-                logger.debug(f"Strategy failed: {e}")
-                continue
+        all_results = self._run_strategies(strategies, clean_query, product_name, max_results)
         
         # If we still have no results, fall back to basic search
         if not all_results:
@@ -122,6 +123,63 @@ class JumiaScraper(BaseScraper):
         logger.info(f"🎯 Jumia ROBUST: Found {len(filtered_results)} relevant products")
         return filtered_results
     
+    def _run_strategies(self, strategies, clean_query: str, product_name: str, max_results: int) -> List[Dict]:
+        """Run strategies STRATEGY_WORKERS at a time, merging results as they arrive,
+        until enough high-scoring items are in"""
+        product_lower = product_name.lower()
+        all_results = []
+        seen = set()
+        high_scoring = 0
+        
+        # Strategies are handed out here, not queued, so none starts after the early exit
+        queued = iter(strategies)
+        running = {}
+        executor = ThreadPoolExecutor(max_workers=self.STRATEGY_WORKERS)
+        
+        def start_next() -> bool:
+            strategy = next(queued, None)
+            if strategy is not None:
+                running[executor.submit(strategy, clean_query, product_name, max_results)] = strategy.__name__
+            return strategy is not None
+        
+        try:
+            for _ in range(self.STRATEGY_WORKERS):
+                start_next()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        logger.debug(f"Strategy {name} failed: {e}")
+                        results = []
+                    
+                    if results:
+                        logger.info(f"✅ Strategy {name} found {len(results)} items")
+                    
+                    # Merge, skipping duplicates
+                    for item in results or []:
+                        key = (item['name'][:50], item['price'])
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        all_results.append(item)
+                        if self._score_result(item, product_lower) >= self.HIGH_SCORE_THRESHOLD:
+                            high_scoring += 1
+                
+                if high_scoring >= max_results:
+                    logger.info(f"⚡ {high_scoring} high-scoring items found, skipping slower strategies")
+                    break
+                while len(running) < self.STRATEGY_WORKERS and start_next():
+                    pass
+        finally:
+            # Wait for strategies still running, so none keeps fetching (and
+            # spending rate-limit tokens) into the next scrape
+            executor.shutdown(wait=True)
+        
+        return all_results
+    
     def _clean_search_query(self, product_name: str) -> str:
         """Clean search query for better results"""
         # Remove common words that cause accessory results
@@ -158,13 +216,15 @@ class JumiaScraper(BaseScraper):
                     logger.info(f"📁 Searching in category: {category}")
                     
                     response = self.session.get(url, timeout=10)
-                    soup = BeautifulSoup(response.text, 'html.parser')
+                    soup = parse_html(response.text)
                     
                     products = soup.select('article.prd')[:max_results * 2]
                     if products:
-                        parsed = self._parse_products(products)
-                        # Filter for our specific query
-                        filtered = self._filter_by_query(parsed, original_query)
+                        # Parse, then filter for our specific query
+                        filtered = self._parse_page(
+                            f"{url}#{original_lower}", products,
+                            lambda found: self._filter_by_query(self._parse_products(found), original_query)
+                        )
                         if filtered:
                             return filtered[:max_results]
                 except:
@@ -177,14 +237,14 @@ class JumiaScraper(BaseScraper):
         try:
             search_url = f"{self.BASE_URL}/catalog/?q={query.replace(' ', '-')}"
             response = self.session.get(search_url, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text)
             
             all_products = soup.select('article.prd')[:max_results * 3]
             if not all_products:
                 return []
             
             # Parse all
-            all_parsed = self._parse_products(all_products)
+            all_parsed = self._parse_page(search_url, all_products, self._parse_products)
             
             # Filter by price thresholds based on product type
             original_lower = original_query.lower()
@@ -238,17 +298,19 @@ class JumiaScraper(BaseScraper):
         elif 'samsung' in original_lower:
             alternate_queries = ["samsung galaxy", "samsung phone"]
         
+        alternate_queries = alternate_queries[:2]  # Try first 2 alternates
+        if not alternate_queries:
+            return []
+        
+        # Fetch the alternates concurrently too
         results = []
-        for alt_query in alternate_queries[:2]:  # Try first 2 alternates
-            try:
-                alt_results = self._search_basic(alt_query, max_results)
+        with ThreadPoolExecutor(max_workers=len(alternate_queries)) as executor:
+            for alt_results in executor.map(lambda q: self._search_basic(q, max_results), alternate_queries):
                 if alt_results:
                     # Filter to match original query
                     filtered = self._filter_by_query(alt_results, original_query)
                     if filtered:
                         results.extend(filtered)
-            except:
-                continue
         
         return results[:max_results]
     
@@ -260,12 +322,14 @@ class JumiaScraper(BaseScraper):
             url = f"{self.BASE_URL}/mobile-phones/?q={search_term}"
             
             response = self.session.get(url, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text)
             
             products = soup.select('article.prd')[:max_results * 2]
             if products:
-                parsed = self._parse_products(products)
-                filtered = self._filter_by_query(parsed, original_query)
+                filtered = self._parse_page(
+                    f"{url}#{original_query.lower()}", products,
+                    lambda found: self._filter_by_query(self._parse_products(found), original_query)
+                )
                 if filtered:
                     logger.info(f"📱 Mobile category search: {len(filtered)} items")
                     return filtered[:max_results]
@@ -279,10 +343,10 @@ class JumiaScraper(BaseScraper):
         try:
             search_url = f"{self.BASE_URL}/catalog/?q={query.replace(' ', '-')}"
             response = self.session.get(search_url, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = parse_html(response.text)
             
             products = soup.select('article.prd')[:max_results]
-            return self._parse_products(products)
+            return self._parse_page(f"{search_url}#basic", products, self._parse_products)
         except:
             return []
     
@@ -300,6 +364,7 @@ class JumiaScraper(BaseScraper):
         
         return results
     
+    @timed('parse')
     def _parse_single_product(self, product) -> Optional[Dict]:
         """Parse single Jumia product"""
         try:
@@ -362,35 +427,9 @@ class JumiaScraper(BaseScraper):
     
     def _is_accessory(self, name: str, price: float) -> bool:
         """Determine if product is likely an accessory"""
-        name_lower = name.lower()
-        
-        # Common accessory keywords
-        accessory_keywords = [
-            'case', 'cover', 'charger', 'cable', 'adapter',
-            'protector', 'pouch', 'holder', 'stand', 'skin',
-            'tempered glass', 'screen protector', 'battery',
-            'casing', 'jack', 'dock', 'mount', 'otterbox',
-            'spigen', 'ring', 'grip', 'strap', 'glass'
-        ]
-        
-        # Check keywords
-        for keyword in accessory_keywords:
-            if keyword in name_lower:
-                return True
-        
-        # Check for "for iPhone/Samsung" pattern
-        if re.search(r'for\s+(iphone|samsung|android)', name_lower):
-            return True
-        
-        # Price-based heuristics
-        if 'iphone' in name_lower and price < 50000:
-            return True  # Too cheap for real iPhone
-        
-        if 'samsung' in name_lower and 'galaxy' in name_lower and price < 30000:
-            return True  # Too cheap for real Samsung
-        
-        return False
+        return is_accessory(name, price)
     
+    @timed('filter')
     def _filter_by_query(self, products: List[Dict], original_query: str) -> List[Dict]:
         """Filter products to match original query"""
         if not products:
@@ -420,6 +459,7 @@ class JumiaScraper(BaseScraper):
         
         return filtered
     
+    @timed('filter')
     def _filter_final_results(self, all_results: List[Dict], product_name: str, max_results: int) -> List[Dict]:
         """Final filtering and sorting"""
         if not all_results:
@@ -491,94 +531,108 @@ class JumiaScraper(BaseScraper):
 class SeleniumBaseScraper(BaseScraper):
     """Base class for Selenium scrapers"""
     
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, pool: Optional[DriverPool] = None):
         super().__init__()
         self.headless = headless
-        self.driver = None
-        self.setup_driver()
+        self.pool = pool or get_driver_pool(headless)
+        self._local = threading.local()
+        # Fail fast (so managers can fall back) if Chrome can't start
+        self.pool.warm()
     
-    def setup_driver(self):
-        """Setup Chrome driver"""
-        options = Options()
-        
-        if self.headless:
-            options.add_argument("--headless")
-        
-        # Anti-detection settings
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-        
-        # Stealth mode
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        
-        # Catalina-compatible options
-        options.add_argument("--disable-software-rasterizer")
-        
+    @property
+    def driver(self):
+        """Driver leased to the current thread's search"""
+        return getattr(self._local, 'driver', None)
+    
+    @single_flight
+    def search_product(self, product_name: str, max_results: int = 10) -> List[Dict]:
+        """Lease a warm driver from the pool and run the search"""
+        with self.pool.lease() as driver:
+            self._local.driver = driver
+            try:
+                return self._search(product_name, max_results)
+            finally:
+                self._local.driver = None
+    
+    def _search(self, product_name: str, max_results: int) -> List[Dict]:
+        """Search using self.driver - to be implemented by child classes"""
+        raise NotImplementedError
+    
+    @property
+    def _static_page(self) -> bool:
+        """Replayed pages never change, so there is nothing to wait for"""
+        return getattr(self.driver, 'STATIC_PAGE', False)
+    
+    @timed('fetch')
+    def _load(self, url: str):
+        """Navigate the leased driver, respecting the domain rate limit"""
+        rate_limiter.acquire(url)
+        self.driver.get(url)
+        self.pool.note_page_load(self.driver)
+    
+    @timed('fetch')
+    def _wait_until_ready(self, timeout: float = 15):
+        """Wait for the DOM to finish loading instead of sleeping"""
+        if self._static_page:
+            timeout = 0
         try:
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
-            
-            # Execute stealth script
-            self.driver.execute_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-            """)
-            
-            logger.info("✅ Selenium driver initialized")
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize Selenium: {e}")
-            raise
+            WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(
+                lambda d: d.execute_script("return document.readyState") == "complete"
+            )
+        except TimeoutException:
+            logger.warning(f"Page not ready after {timeout}s, continuing")
     
-    def _scroll_page(self, scroll_pause_time: float = 2):
-        """Scroll page to load dynamic content"""
+    @timed('fetch')
+    def _wait_for_products(self, selector: str, timeout: float = 10) -> bool:
+        """Wait until at least one product element is present"""
+        if self._static_page:
+            timeout = 0
         try:
-            # Get scroll height
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
+            WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+            )
+            return True
+        except TimeoutException:
+            return False
+    
+    @timed('fetch')
+    def _scroll_page(self, product_selector: str, max_scrolls: int = 5, growth_timeout: float = 3):
+        """Scroll to load dynamic content until the product count stops growing"""
+        if self._static_page:
+            return  # Replayed pages were recorded fully scrolled
+        
+        try:
+            count = len(self.driver.find_elements(By.CSS_SELECTOR, product_selector))
             
-            # Scroll slowly
-            for i in range(3):  # Scroll 3 times
+            for _ in range(max_scrolls):
                 # Scroll to bottom
                 self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(scroll_pause_time)
                 
-                # Calculate new scroll height
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
+                # Wait for more products to render, give up once they stop coming
+                try:
+                    WebDriverWait(self.driver, growth_timeout, poll_frequency=0.2).until(
+                        lambda d: len(d.find_elements(By.CSS_SELECTOR, product_selector)) > count
+                    )
+                except TimeoutException:
                     break
-                last_height = new_height
+                count = len(self.driver.find_elements(By.CSS_SELECTOR, product_selector))
             
-            # Scroll back up a bit
-            self.driver.execute_script("window.scrollTo(0, 500);")
-            time.sleep(1)
+            logger.debug(f"Scrolling loaded {count} products")
             
         except Exception as e:
             logger.warning(f"Scrolling failed: {e}")
     
     def close(self):
-        """Close the driver"""
-        if self.driver:
-            self.driver.quit()
-            logger.info("✅ Selenium driver closed")
-    
-    def __del__(self):
-        """Destructor to ensure driver is closed"""
-        try:
-            self.close()
-        except:
-            pass
+        """Close idle pooled drivers (the pool restarts them on demand)"""
+        self.pool.drain()
 
 class KongaSeleniumScraper(SeleniumBaseScraper):
     """Konga scraper using Selenium"""
     
     BASE_URL = "https://www.konga.com"
+    PRODUCT_SELECTOR = "div._7e3920c, article.product, [data-testid*='product']"
     
-    def search_product(self, product_name: str, max_results: int = 10) -> List[Dict]:
+    def _search(self, product_name: str, max_results: int) -> List[Dict]:
         """Search product on Konga using Selenium"""
         logger.info(f"🔍 Searching Konga (Selenium) for: {product_name}")
         results = []
@@ -588,31 +642,25 @@ class KongaSeleniumScraper(SeleniumBaseScraper):
             url = f"{self.BASE_URL}/search?search={search_query}"
             
             logger.info(f"🌐 Navigating to: {url}")
-            self.driver.get(url)
+            self._load(url)
             
             # Wait for page to load
-            time.sleep(random.uniform(3, 5))
+            self._wait_until_ready()
             
             # Check for blocking/CAPTCHA
             page_source = self.driver.page_source.lower()
             if 'captcha' in page_source:
                 logger.warning("🛡️ CAPTCHA detected on Konga")
                 self._handle_captcha()
-                time.sleep(5)
             
-            # Scroll to load products
-            self._scroll_page()
-            
-            # Wait for products to load
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "div._7e3920c, article.product, [data-testid*='product']"))
-                )
-            except TimeoutException:
+            # Wait for products to load, then scroll until no more appear
+            if self._wait_for_products(self.PRODUCT_SELECTOR):
+                self._scroll_page(self.PRODUCT_SELECTOR)
+            else:
                 logger.warning("Products not found with standard selectors")
             
             # Get page source and parse
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+            soup = parse_html(self.driver.page_source)
             
             # Try multiple selectors for Konga products
             selectors = [
@@ -633,7 +681,7 @@ class KongaSeleniumScraper(SeleniumBaseScraper):
             
             if not products:
                 # Try to find product links as fallback
-                product_links = soup.find_all('a', href=lambda x: x and '/product/' in str(x))
+                product_links = soup.select('a[href*="/product/"]')
                 if product_links:
                     products = product_links[:max_results]
                     logger.info(f"✅ Konga Selenium: Found {len(products)} product links")
@@ -644,23 +692,7 @@ class KongaSeleniumScraper(SeleniumBaseScraper):
             logger.info(f"📦 Konga Selenium: Parsing {len(products)} products")
             
             # Parse products
-            for i, product in enumerate(products):
-                try:
-                    product_data = self._parse_product(product)
-                    if product_data and product_data.get('price'):
-                        results.append(product_data)
-                        logger.debug(f"✅ Parsed Konga product {i+1}/{len(products)}")
-                        
-                        # Take screenshot of first product (debug)
-                        if i == 0 and not self.headless:
-                            self.driver.save_screenshot('konga_first_product.png')
-                        
-                except Exception as e:
-                    logger.error(f"❌ Error parsing Konga product {i+1}: {e}")
-                    continue
-                
-                # Small delay between parsing
-                time.sleep(random.uniform(0.5, 1.0))
+            results = self._parse_page(url, products, self._parse_products)
             
             logger.info(f"✅ Konga Selenium: Successfully parsed {len(results)} products")
             
@@ -669,6 +701,25 @@ class KongaSeleniumScraper(SeleniumBaseScraper):
         
         return results
     
+    def _parse_products(self, products) -> List[Dict]:
+        """Parse Konga product elements"""
+        results = []
+        for i, product in enumerate(products):
+            try:
+                product_data = self._parse_product(product)
+                if product_data and product_data.get('price'):
+                    results.append(product_data)
+                    logger.debug(f"✅ Parsed Konga product {i+1}/{len(products)}")
+                    
+                    # Take screenshot of first product (debug)
+                    if i == 0 and not self.headless:
+                        self.driver.save_screenshot('konga_first_product.png')
+                    
+            except Exception as e:
+                logger.error(f"❌ Error parsing Konga product {i+1}: {e}")
+                continue
+        return results
+    
     def _handle_captcha(self):
         """Handle CAPTCHA if detected"""
         try:
@@ -677,8 +728,10 @@ class KongaSeleniumScraper(SeleniumBaseScraper):
                 input("Press Enter after solving CAPTCHA...")
             else:
                 logger.warning("🤖 Running in headless mode, refreshing page...")
+                rate_limiter.acquire(self.driver.current_url)
                 self.driver.refresh()
-                time.sleep(5)
+                self.pool.note_page_load(self.driver)
+                self._wait_until_ready()
         except Exception as e:
             logger.error(f"CAPTCHA handling failed: {e}")
     
@@ -686,6 +739,7 @@ class KongaSeleniumScraper(SeleniumBaseScraper):
 
     # Update the KongaSeleniumScraper._parse_product method in scraper_v2.py:
 
+    @timed('parse')
     def _parse_product(self, product_element) -> Optional[Dict]:
         """Parse Konga product element - FIXED VERSION"""
         try:
@@ -716,17 +770,12 @@ class KongaSeleniumScraper(SeleniumBaseScraper):
                 }
             
             # Original parsing for div elements
-            if hasattr(product_element, 'prettify'):
-                product_html = product_element.prettify()
-            else:
-                product_html = str(product_element)
-            
-            soup = BeautifulSoup(product_html, 'html.parser')
+            soup = product_element
             
-            # Try to find product card
+            # Try to find a product card nested inside
             product_card = soup.select_one('div._7e3920c, article.product, div.product-card')
             if product_card:
-                soup = BeautifulSoup(str(product_card), 'html.parser')
+                soup = product_card
             
             # Extract name
             name = "N/A"
@@ -781,7 +830,7 @@ class KongaSeleniumScraper(SeleniumBaseScraper):
             
             # Extract URL
             url = ""
-            link_elem = soup.find('a', href=True)
+            link_elem = first_link(soup)
             if link_elem:
                 url = link_elem['href']
                 if url and not url.startswith('http'):
@@ -804,8 +853,9 @@ class JijiSeleniumScraper(SeleniumBaseScraper):
     """Jiji scraper using Selenium (your working code)"""
     
     BASE_URL = "https://jiji.ng"
+    LISTING_SELECTOR = ".b-list-advert-base, [data-testid='product-card']"
     
-    def search_product(self, product_name: str, max_results: int = 10) -> List[Dict]:
+    def _search(self, product_name: str, max_results: int) -> List[Dict]:
         """Search product on Jiji using Selenium"""
         logger.info(f"🔍 Searching Jiji (Selenium) for: {product_name}")
         results = []
@@ -815,61 +865,39 @@ class JijiSeleniumScraper(SeleniumBaseScraper):
             url = f"{self.BASE_URL}/search?query={search_query}"
             
             logger.info(f"🌐 Navigating to: {url}")
-            self.driver.get(url)
+            self._load(url)
             
             # Wait for page to load
-            time.sleep(random.uniform(3, 5))
+            self._wait_until_ready()
             
             # Check for CAPTCHA
             page_source = self.driver.page_source.lower()
             if 'captcha' in page_source or 'cloudflare' in page_source:
                 logger.warning("🛡️ CAPTCHA detected on Jiji")
                 self._handle_captcha()
-                time.sleep(5)
             
-            # Wait for listings to load
-            try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".b-list-advert-base, [data-testid='product-card']"))
-                )
-            except:
+            # Wait for listings to load, then scroll until no more appear
+            if self._wait_for_products(self.LISTING_SELECTOR):
+                self._scroll_page(self.LISTING_SELECTOR)
+            else:
                 logger.warning("Listings not found with standard selector")
             
-            # Scroll to load more content
-            self._scroll_page()
-            
-            # Get page source and parse with BeautifulSoup
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+            # Get page source and parse
+            soup = parse_html(self.driver.page_source)
             
             # Find listings
             listings = soup.select('.b-list-advert-base, [data-testid="product-card"], .listing-item')
             
             if not listings:
                 # Try to find by href pattern
-                all_links = soup.find_all('a', href=lambda x: x and '/item/' in str(x))
+                all_links = soup.select('a[href*="/item/"]')
                 listings = all_links[:max_results]
                 logger.info(f"Found {len(listings)} listings via href pattern")
             
             logger.info(f"Found {len(listings)} total listings")
             
             # Parse listings
-            for i, listing in enumerate(listings[:max_results]):
-                try:
-                    listing_data = self._parse_listing(listing)
-                    if listing_data and listing_data.get('price'):
-                        results.append(listing_data)
-                        logger.debug(f"✅ Parsed Jiji listing {i+1}/{len(listings)}")
-                        
-                        # Take screenshot of first listing
-                        if i == 0 and not self.headless:
-                            self.driver.save_screenshot('jiji_first_listing.png')
-                        
-                except Exception as e:
-                    logger.error(f"❌ Error parsing Jiji listing {i+1}: {e}")
-                    continue
-                
-                # Random delay between parsing
-                time.sleep(random.uniform(0.5, 1.5))
+            results = self._parse_page(url, listings[:max_results], self._parse_listings)
             
             logger.info(f"🎉 Jiji Selenium: Successfully parsed {len(results)} listings")
             
@@ -878,6 +906,25 @@ class JijiSeleniumScraper(SeleniumBaseScraper):
         
         return results
     
+    def _parse_listings(self, listings) -> List[Dict]:
+        """Parse Jiji listing elements"""
+        results = []
+        for i, listing in enumerate(listings):
+            try:
+                listing_data = self._parse_listing(listing)
+                if listing_data and listing_data.get('price'):
+                    results.append(listing_data)
+                    logger.debug(f"✅ Parsed Jiji listing {i+1}/{len(listings)}")
+                    
+                    # Take screenshot of first listing
+                    if i == 0 and not self.headless:
+                        self.driver.save_screenshot('jiji_first_listing.png')
+                    
+            except Exception as e:
+                logger.error(f"❌ Error parsing Jiji listing {i+1}: {e}")
+                continue
+        return results
+    
     def _handle_captcha(self):
         """Handle CAPTCHA if detected"""
         try:
@@ -886,22 +933,20 @@ class JijiSeleniumScraper(SeleniumBaseScraper):
                 input("Press Enter after solving CAPTCHA...")
             else:
                 logger.warning("🤖 Running in headless mode, refreshing page...")
+                rate_limiter.acquire(self.driver.current_url)
                 self.driver.refresh()
-                time.sleep(5)
+                self.pool.note_page_load(self.driver)
+                self._wait_until_ready()
         except Exception as e:
             logger.error(f"CAPTCHA handling failed: {e}")
     
     # Update JijiSeleniumScraper's _parse_listing method:
 
+    @timed('parse')
     def _parse_listing(self, listing_element) -> Optional[Dict]:
         """Parse Jiji listing element - WITH FILTERING"""
         try:
-            if hasattr(listing_element, 'prettify'):
-                listing_html = listing_element.prettify()
-            else:
-                listing_html = str(listing_element)
-            
-            soup = BeautifulSoup(listing_html, 'html.parser')
+            soup = listing_element
             
             # Extract title
             title_elem = soup.select_one('.b-advert-title-inner, .title, h3, [class*="title"]')
@@ -934,7 +979,7 @@ class JijiSeleniumScraper(SeleniumBaseScraper):
             
             # Extract URL
             url = ""
-            link_elem = soup.find('a', href=True)
+            link_elem = first_link(soup)
             if link_elem:
                 url = link_elem['href']
                 if url and not url.startswith('http'):
@@ -1031,18 +1076,11 @@ class EnhancedScraperManager:
         return results
     
     def save_results(self, results: Dict[str, List[Dict]], product_name: str):
-        """Save results to JSON file"""
-        os.makedirs('engine/data', exist_ok=True)
-        
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"engine/data/{product_name.replace(' ', '_')}_SELENIUM_{timestamp}.json"
-        
+        """Append results to the scrape log"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
-            
-            logger.info(f"💾 Saved results to {filename}")
-            return filename
+            location = scrape_log.append(product_name, results, label='selenium')
+            logger.info(f"💾 Saved results to {location}")
+            return location
             
         except Exception as e:
             logger.error(f"Save failed: {e}")
@@ -1050,10 +1088,8 @@ class EnhancedScraperManager:
     
     def close_all(self):
         """Close all Selenium drivers"""
-        if self.jiji:
-            self.jiji.close()
-        if self.konga:
-            self.konga.close()
+        # Scrapers share pooled drivers (and may be requests fallbacks)
+        shutdown_driver_pools()
         logger.info("✅ All Selenium drivers closed")
         
         
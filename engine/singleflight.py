@@ -0,0 +1,75 @@
+"""
+NAIRA SNIPER - SINGLE FLIGHT
+Concurrent identical scrapes share one request and its result
+"""
+import copy
+import functools
+import threading
+import logging
+from typing import Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """One in-flight call and the callers waiting on it"""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one fn per key at a time; late callers wait for its result"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            logger.info(f"🤝 Joining in-flight scrape: {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # Callers own (and may mutate) their results
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+# Global instance
+scrape_flights = SingleFlight()
+
+
+def single_flight(search_product):
+    """Coalesce concurrent search_product calls for the same scraper, query and size"""
+    @functools.wraps(search_product)
+    def wrapper(self, product_name: str, max_results: int = 10):
+        source = f"{type(self).__module__}.{type(self).__name__}"
+        query = ' '.join(product_name.lower().split())
+        return scrape_flights.do((source, query, max_results), search_product, self, product_name, max_results)
+    return wrapper
@@ -5,7 +5,6 @@ COMPLETE REAL Price Comparison System - NO MOCK DATA
 """
 import sys
 import os
-import json
 import time
 import concurrent.futures
 from datetime import datetime
@@ -352,16 +351,11 @@ class RealPriceSystem:
                 print(f"   💰 ₦{item['price']:,.0f} on {item['source'].upper()}")
     
     def save_results(self, results, product_name: str):
-        """Save results to JSON file"""
-        os.makedirs('engine/data', exist_ok=True)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"engine/data/REAL_{product_name.replace(' ', '_')}_{timestamp}.json"
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
-        
-        print(f"\n💾 REAL data saved to: {filename}")
-        return filename
+        """Append results to the scrape log"""
+        from engine.scrape_log import scrape_log
+        location = scrape_log.append(product_name, results, label='real')
+        print(f"\n💾 REAL data saved to: {location}")
+        return location
     
     def close_all(self):
         """Close all Selenium drivers"""
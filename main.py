@@ -1,12 +1,17 @@
 from fastapi import FastAPI
-from app.database import create_db_and_tables
+from app.database import create_db_and_tables, engine
 from app.routers import products, market, webhooks
+from brain.profiler import fit_intent_matcher
 from contextlib import asynccontextmanager
+from sqlmodel import Session
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Create database tables
     create_db_and_tables()
+    # Calibrate the local intent classifier on what the LLM has labelled so far
+    with Session(engine) as session:
+        fit_intent_matcher(session)
     yield
     # Shutdown: cleanup if needed
 
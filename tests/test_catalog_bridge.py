@@ -0,0 +1,50 @@
+from sqlmodel import Session, select
+
+from app.db_engine import create_db_engine
+from app.models import CompetitorPrice, Product
+from engine.catalog_bridge import CatalogBridge, CatalogIndex
+from engine.database import PriceDatabase
+
+IPHONE = Product(id=1, name="iPhone 13", model="A2633", current_price=650000, floor_price=600000)
+CASE = Product(id=2, name="iPhone 13 Case", model="MagSafe", current_price=15000, floor_price=9000)
+
+
+def test_accessory_titles_match_but_are_not_plausible():
+    index = CatalogIndex([IPHONE])
+    for title in ("iPhone 13 Silicone Case Cover", "Tempered Glass for iPhone 13",
+                  "iPhone 13 Screen Protector"):
+        assert index.match("iPhone 13", title) == 1
+        assert not index.plausible(1, title, 650000)
+    assert index.plausible(1, "Apple iPhone 13 128GB Midnight", 640000)
+
+
+def test_implausibly_cheap_rows_are_rejected():
+    index = CatalogIndex([IPHONE])
+    assert not index.plausible(1, "Apple iPhone 13 128GB", 45000)
+
+
+def test_accessory_catalog_products_still_match_their_listings():
+    index = CatalogIndex([IPHONE, CASE])
+    assert index.match("iPhone 13 Case", "iPhone 13 Silicone Case") == 2
+    assert index.plausible(2, "iPhone 13 Silicone Case", 12000)
+
+
+def test_bridge_skips_accessories(tmp_path):
+    price_db = PriceDatabase(f"sqlite:///{tmp_path}/prices.db")
+    app_engine = create_db_engine(f"sqlite:///{tmp_path}/app.db")
+    bridge = CatalogBridge(price_db, app_engine=app_engine)
+    with Session(app_engine) as session:
+        session.add(Product(**IPHONE.model_dump()))
+        session.commit()
+
+    price_db.ingest("iPhone 13", {"jumia": [
+        {"name": "Apple iPhone 13 128GB", "price": 640000, "url": "https://jumia/1"},
+        {"name": "iPhone 13 Silicone Case Cover", "price": 4500, "url": "https://jumia/2"},
+        {"name": "Tempered Glass for iPhone 13", "price": 2500, "url": "https://jumia/3"},
+    ]})
+    stats = bridge.run()
+
+    assert stats["ingested"] == 1
+    assert stats["rejected"] == 2
+    with Session(app_engine) as session:
+        assert [row.price for row in session.exec(select(CompetitorPrice))] == [640000]